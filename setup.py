@@ -29,8 +29,18 @@ setup(
 
     license='Apache License, Version 2.0',
 
-    packages=['storage_orm', 'storage_orm.redis_impl'],
+    packages=['storage_orm', 'storage_orm.redis_impl', 'storage_orm.memory_impl'],
     install_requires=['redis'],
+    extras_require={
+        # Разбор ответов Redis на C (redis-py использует hiredis автоматически)
+        'hiredis': ['hiredis'],
+    },
+    entry_points={
+        'console_scripts': [
+            'storage-orm-load=storage_orm.redis_impl.loader:main',
+            'storage-orm-migrate=storage_orm.redis_impl.migration:main',
+        ],
+    },
 
     classifiers=[
         'License :: OSI Approved :: Apache Software License',
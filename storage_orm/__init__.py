@@ -1,5 +1,7 @@
 from .redis_impl import RedisORM
 from .redis_impl import RedisItem
+from .memory_impl import MemoryORM
+from .memory_impl import MemoryItem
 
 from .storage_orm import StorageORM
 from .storage_item import StorageItem
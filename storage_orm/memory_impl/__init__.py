@@ -0,0 +1,3 @@
+from .memory_orm import MemoryORM
+from .memory_item import MemoryItem
+from .memory_storage import MemoryStorage
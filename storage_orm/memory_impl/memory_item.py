@@ -0,0 +1,225 @@
+from __future__ import annotations
+import copy
+import logging
+import operator
+from typing import Any
+from typing import cast
+from typing import Type
+from typing import Union
+from typing import TypeVar
+from typing import Callable
+from typing import Optional
+
+from .memory_storage import MemoryStorage
+from ..storage_item import StorageItem
+from ..operation_result import OperationResult
+from ..operation_result import OperationStatus
+
+from ..exceptions import NotFoundException
+from ..exceptions import MoreThanOneFoundException
+
+T = TypeVar('T', bound='MemoryItem')
+KEYS_DELIMITER = "."
+# Условия на значения полей (как у RedisItem.filter)
+FIELD_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda value, expected: value in expected,
+}
+
+
+class MemoryItem(StorageItem):
+    """
+        Модель объекта, хранимого в памяти процесса (MemoryStorage)
+        - описание модели и методы save/filter/get/using такие же, как у RedisItem,
+          поэтому модель подходит для тестов и локальных данных без сервера Redis
+        - значения параметров Meta.table полученных объектов - строки (как у RedisItem)
+    """
+    _table: str
+    _table_keys: dict[str, int]
+    _table_args: dict[str, str]
+    _params: dict[str, Any]
+    _db_instance: Union[MemoryStorage, None] = None
+
+    class Meta:
+        table = ""  # Pattern имени записи, например, "subsystem.{subsystem_id}.tag.{tag_id}"
+
+    def __init_subclass__(cls) -> None:
+        cls._table_keys = {
+            index.replace("{", "").replace("}", ""): key
+                for key, index in enumerate(cls.Meta.table.split(KEYS_DELIMITER))
+                    if index.startswith("{") and index.endswith("}")
+        }
+
+    def __init__(self, **kwargs) -> None:
+        # Формирование полей модели из переданных дочернему классу аргументов
+        [self.__dict__.__setitem__(key, value) for key, value in kwargs.items()]
+        self._table = self.__class__.Meta.table.format(**kwargs)
+        self._table_args = {key: str(kwargs[key]) for key in self.__class__._table_keys}
+        self._params = {
+            key: kwargs.get(key, None)
+                for key in self.__class__.__annotations__
+        }
+        # Перегрузка методов для экземпляра класса
+        self.using = self.instance_using  # type: ignore
+
+    @classmethod
+    def _set_global_instance(cls: Type[T], db_instance: MemoryStorage) -> None:
+        """ Установка глобального хранилища для всех моделей """
+        cls._db_instance = db_instance
+
+    @classmethod
+    def _on_error_actions(cls: Type[T], exception: Exception) -> None:
+        """
+            Действия, выполняющиеся в случае возникновения исключения
+                во время сохранения объекта
+        """
+        logging.exception(exception)
+
+    @classmethod
+    def get(cls: Type[T], _items: Optional[list[T]] = None, **kwargs) -> T:
+        """
+            Получение одного объекта по выбранному фильтру
+
+                StorageItem.get(subsystem_id=10, tag_id=55)
+        """
+        result_list: list[T] = cls.filter(_items=_items, **kwargs)
+        if not result_list:
+            raise NotFoundException(f"{cls.__name__} item not found...")
+        if len(result_list) > 1:
+            raise MoreThanOneFoundException(f"{cls.__name__} multiple items found...")
+
+        return result_list[0]
+
+    @classmethod
+    def filter(cls: Type[T], _items: Optional[list[T]] = None, **kwargs) -> list[T]:
+        """
+            Получение объектов по фильтру переданных аргументов, например:
+
+                StorageItem.filter(subsystem_id=10, tag_id=55)
+                StorageItem.filter(subsystem_id__in=[10, 47], any_value__gt=5)
+                StorageItem.filter(_items=[another_item])
+
+            Параметры Meta.table выбираются по индексам хранилища,
+            условия на значения полей проверяются для найденных записей
+        """
+        if cls._db_instance is None:
+            raise Exception("Memory storage not connected...")
+        if not len(kwargs) and not _items:
+            raise Exception(f"{cls.__name__}.get() has empty filter. OOM possible.")
+        table_filters, predicates = cls._split_kwargs(kwargs=kwargs)
+        filters_list: list[dict[str, set[str]]] = [
+            {key: {value} for key, value in item._table_args.items()} | table_filters
+                for item in _items
+        ] if _items else [table_filters]
+        result_items: list[T] = []
+        seen: set[str] = set()
+        for filters in filters_list:
+            for table_args, fields in cls._db_instance.find(table=cls.Meta.table, filters=filters):
+                item: T = cls(**(fields | table_args))
+                if item._table in seen or not cls._matches(item=item, predicates=predicates):
+                    continue
+                seen.add(item._table)
+                result_items.append(item)
+        return result_items
+
+    @classmethod
+    def _split_kwargs(cls: Type[T], kwargs: dict) -> tuple[dict[str, set[str]], list[tuple[str, str, Any]]]:
+        """
+            Разделение аргументов фильтра на:
+                - значения параметров Meta.table: subsystem_id__in=[1, 2] -> {"subsystem_id": {"1", "2"}}
+                - условия на значения полей: any_value__gt=10 -> ("any_value", "gt", 10)
+        """
+        table_filters: dict[str, set[str]] = {}
+        predicates: list[tuple[str, str, Any]] = []
+        for key, value in kwargs.items():
+            field, _, condition = key.rpartition("__")
+            if not field:
+                field, condition = key, "eq"
+            if field in cls._table_keys and condition in ("eq", "in"):
+                values: set[str] = {str(item) for item in value} if condition == "in" else {str(value)}
+                # Повторное условие на параметр сужает набор значений
+                table_filters[field] = table_filters[field] & values if field in table_filters else values
+            elif field in cls.__annotations__ and condition in FIELD_OPERATORS:
+                predicates.append((field, condition, value))
+            else:
+                raise Exception(f"{cls.__name__}.filter() unknown argument {key}...")
+        return table_filters, predicates
+
+    @staticmethod
+    def _matches(item: MemoryItem, predicates: list[tuple[str, str, Any]]) -> bool:
+        """ Проверка условий на значения полей объекта (объект без поля не подходит) """
+        return all(
+            item._params.get(field) is not None
+                and FIELD_OPERATORS[condition](item._params[field], expected)
+            for field, condition, expected in predicates
+        )
+
+    @property
+    def mapping(self) -> dict[str, Any]:
+        """ Ключи и значения объекта в формате RedisItem (префикс.поле: значение) """
+        return {
+            KEYS_DELIMITER.join([self._table, key]): value
+                for key, value in self._params.items()
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self._table=}, "
+            f"{self._table_keys=}, {self._params=})"
+        )
+
+    def __eq__(self, other: Type[T]) -> bool:
+        if isinstance(other, self.__class__):
+            return self._params == other._params and self._table == other._table
+
+        return False
+
+    def instance_using(self: T, db_instance: MemoryStorage = None) -> T:
+        """
+            Выполнение операций с хранилищем путём direct-указания, например:
+
+                another_storage: MemoryStorage = MemoryStorage()
+                storage_item_instance.using(db_instance=another_storage).save()
+
+            Создаётся копия объекта для работы через "неглобальное" хранилище
+        """
+        copied_instance: T = copy.copy(self)
+        copied_instance._db_instance = db_instance
+        return copied_instance
+
+    @classmethod
+    def using(cls: Type[T], db_instance: MemoryStorage = None) -> T:
+        """
+            Выполнение операций с хранилищем путём direct-указания, например:
+
+                another_storage: MemoryStorage = MemoryStorage()
+                StorageItem.using(db_instance=another_storage).get(subsystem_id=10)
+
+            Создаётся копия класса для работы через "неглобальное" хранилище
+        """
+        class CopiedClass(cls):  # type: ignore
+            _db_instance = db_instance
+        CopiedClass.__annotations__.update(cls.__annotations__)
+        return cast(T, CopiedClass)
+
+    def save(self) -> OperationResult:
+        """ Одиночная вставка """
+        if self._db_instance is None:
+            raise Exception("Memory storage not connected...")
+        try:
+            self._db_instance.write(
+                table=self.__class__.Meta.table,
+                key_names=tuple(self._table_keys),
+                records=[(self._table_args, self._params)],
+            )
+            return OperationResult(status=OperationStatus.success)
+        except Exception as exception:
+            self._on_error_actions(exception=exception)
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=str(exception),
+            )
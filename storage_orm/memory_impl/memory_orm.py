@@ -0,0 +1,64 @@
+import logging
+import itertools
+from typing import Iterable
+from typing import Optional
+
+from .memory_item import MemoryItem
+from .memory_item import T as SubclassItemType
+from .memory_storage import MemoryStorage
+from ..operation_result import OperationResult
+from ..operation_result import OperationStatus
+
+from ..storage_orm import StorageORM
+
+
+class MemoryORM(StorageORM):
+    """ Работа с хранилищем в памяти процесса через объектное представление (без сервера БД) """
+    _client: MemoryStorage
+
+    def __init__(self, client: Optional[MemoryStorage] = None) -> None:
+        """ client - хранилище (по умолчанию создаётся новое) """
+        self._client = client if client is not None else MemoryStorage()
+        if MemoryItem._db_instance is None:
+            MemoryItem._set_global_instance(db_instance=self._client)
+
+    def save(self, item: MemoryItem) -> OperationResult:
+        """ Одиночная вставка """
+        return item.save()
+
+    def bulk_create(
+        self,
+        items: Iterable[SubclassItemType],
+        batch_size: int = 10_000,
+    ) -> OperationResult:
+        """
+            Групповая вставка
+            - объекты записываются пакетами по batch_size (одна блокировка хранилища на пакет)
+        """
+        try:
+            items_iterator: Iterable[SubclassItemType] = iter(items)
+            while True:
+                batch: list[SubclassItemType] = list(itertools.islice(items_iterator, batch_size))
+                if not batch:
+                    break
+                # Объекты разных моделей записываются в свои таблицы хранилища
+                for item_class, class_items in itertools.groupby(batch, key=lambda item: item.__class__):
+                    self._client.write(
+                        table=item_class.Meta.table,
+                        key_names=tuple(item_class._table_keys),
+                        records=[(item._table_args, item._params) for item in class_items],
+                    )
+            return OperationResult(status=OperationStatus.success)
+        except Exception as exception:
+            self._on_error_actions(exception=exception)
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=str(exception),
+            )
+
+    def _on_error_actions(self, exception: Exception) -> None:
+        """
+            Действия, выполняющиеся в случае возникновения исключения
+                во время вставки, сохранения, получения данных
+        """
+        logging.exception(exception)
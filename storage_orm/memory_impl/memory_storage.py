@@ -0,0 +1,92 @@
+from __future__ import annotations
+import threading
+import itertools
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+
+class _TableData:
+    """ Записи одной модели (Meta.table) и индексы параметров Meta.table """
+    key_names: tuple[str, ...]
+    records: dict[tuple[str, ...], dict[str, Any]]
+    # {параметр Meta.table: {значение: ключи записей}}
+    index: dict[str, dict[str, set[tuple[str, ...]]]]
+    order: dict[tuple[str, ...], int]
+    _counter: Iterator[int]
+
+    def __init__(self, key_names: tuple[str, ...]) -> None:
+        self.key_names = key_names
+        self.records = {}
+        self.index = {name: {} for name in key_names}
+        self.order = {}
+        self._counter = itertools.count()
+
+
+class MemoryStorage:
+    """
+        Хранилище объектов в памяти процесса (без сервера БД)
+        - записи каждой модели хранятся по значениям параметров Meta.table
+        - для каждого параметра Meta.table ведётся индекс {значение: записи}, поэтому
+          фильтр по параметрам пересекает индексы и не перебирает все записи
+        - повторная запись объекта обновляет переданные поля (как MSET)
+    """
+    _tables: dict[str, _TableData]
+    _lock: threading.RLock
+
+    def __init__(self) -> None:
+        self._tables = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return sum(len(table_data.records) for table_data in self._tables.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables = {}
+
+    def write(
+        self,
+        table: str,
+        key_names: tuple[str, ...],
+        records: Iterable[tuple[dict[str, str], dict[str, Any]]],
+    ) -> None:
+        """ Запись объектов: (значения параметров Meta.table, значения полей) """
+        with self._lock:
+            table_data: _TableData = self._tables.setdefault(table, _TableData(key_names=key_names))
+            for table_args, fields in records:
+                key: tuple[str, ...] = tuple(table_args[name] for name in key_names)
+                record: Any = table_data.records.get(key)
+                if record is None:
+                    record = table_data.records[key] = {}
+                    table_data.order[key] = next(table_data._counter)
+                    for name, value in zip(key_names, key):
+                        table_data.index[name].setdefault(value, set()).add(key)
+                record.update({field: value for field, value in fields.items() if value is not None})
+
+    def find(self, table: str, filters: dict[str, set[str]]) -> list[tuple[dict[str, str], dict[str, Any]]]:
+        """
+            Записи, значения параметров Meta.table которых входят в filters
+                (отсутствующий в filters параметр - любое значение)
+        """
+        with self._lock:
+            table_data: Any = self._tables.get(table)
+            if table_data is None:
+                return []
+            if filters:
+                candidates: list[set[tuple[str, ...]]] = [
+                    set().union(*(table_data.index[name].get(value, set()) for value in values))
+                        for name, values in filters.items()
+                ]
+                # Пересечение начинается с наименьшего множества
+                candidates.sort(key=len)
+                keys: Iterable[tuple[str, ...]] = sorted(
+                    set.intersection(*candidates),
+                    key=table_data.order.__getitem__,
+                )
+            else:
+                keys = list(table_data.records)
+            return [
+                (dict(zip(table_data.key_names, key)), dict(table_data.records[key]))
+                    for key in keys
+            ]
@@ -0,0 +1,190 @@
+"""
+    Загрузка данных из файлов CSV/NDJSON в модель RedisItem
+
+    Приведение типов и формирование ключей выполняются пулом процессов, основной
+    процесс делит файл на записи (CSV-запись может занимать несколько строк) и
+    записывает подготовленные команды пакетами через pipeline. Файл читается
+    порциями, количество порций в обработке ограничено, поэтому объём памяти
+    не зависит от размера файла.
+
+    API:
+        from storage_orm.redis_impl.loader import load_file
+        load_file(orm=orm, model=ExampleItem, path="items.csv")
+
+    CLI:
+        python -m storage_orm.redis_impl.loader --model examples.models:ExampleItem \\
+            --host localhost --port 8379 --db 1 items.ndjson
+"""
+from __future__ import annotations
+import os
+import csv
+import json
+import argparse
+import importlib
+import itertools
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Type
+from typing import Union
+from typing import Optional
+from typing import Iterator
+
+from .redis_orm import RedisORM
+from .redis_item import RedisItem
+from ..operation_result import OperationResult
+from ..operation_result import OperationStatus
+
+FILE_FORMATS: tuple[str, ...] = ("csv", "ndjson")
+
+
+class _CommandsRecorder:
+    """ Замена pipeline: запоминает вызовы команд для передачи между процессами """
+    commands: list[tuple[str, tuple, dict]]
+
+    def __init__(self) -> None:
+        self.commands = []
+
+    def __getattr__(self, command_name: str):
+        def record(*args, **kwargs) -> None:
+            self.commands.append((command_name, args, kwargs))
+        return record
+
+
+def import_model(model_path: str) -> Type[RedisItem]:
+    """ Получение класса модели по пути вида "package.module:ClassName" """
+    module_name, _, class_name = model_path.partition(":")
+    if not class_name:
+        raise Exception(f"Model path must be in format 'module:ClassName', got {model_path}...")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _parse_rows(file_format: str, records: list[Any], header: Optional[list[str]]) -> Iterator[dict]:
+    """ Разбор записей файла (значения CSV-строки или строка NDJSON) в словари аргументов модели """
+    if file_format == "csv":
+        for values in records:
+            yield dict(zip(header, values))
+    else:
+        for line in records:
+            yield json.loads(line)
+
+
+def _prepare_chunk(
+    model: Type[RedisItem],
+    file_format: str,
+    records: list[Any],
+    header: Optional[list[str]],
+) -> list[tuple[str, tuple, dict]]:
+    """ Подготовка команд записи для порции записей (выполняется в дочернем процессе) """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    for row in _parse_rows(file_format=file_format, records=records, header=header):
+        # Приведение типа к соответствующему полю модели
+        for key, field_type in model.__annotations__.items():
+            if key in row and row[key] is not None and field_type in (int, float):
+                row[key] = field_type(row[key])
+        model(**row)._prepare_pipe(pipe=recorder)
+    return recorder.commands
+
+
+def _read_records(file: Any, file_format: str) -> Iterator[Any]:
+    """
+        Записи файла без пустых строк: значения CSV-строки (поле в кавычках может
+          содержать перевод строки) или строка NDJSON
+    """
+    if file_format == "csv":
+        yield from (values for values in csv.reader(file) if values)
+    else:
+        yield from (line for line in file if line.strip())
+
+
+def _read_chunks(records: Iterator[Any], chunk_size: int) -> Iterator[list[Any]]:
+    """ Чтение записей порциями по chunk_size """
+    while True:
+        chunk: list[Any] = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_file(
+    orm: RedisORM,
+    model: Union[Type[RedisItem], str],
+    path: str,
+    file_format: Optional[str] = None,
+    processes: Optional[int] = None,
+    chunk_size: int = 10_000,
+) -> OperationResult:
+    """
+        Загрузка файла CSV (первая строка - заголовок) или NDJSON в модель
+        - model - класс модели или путь к нему ("module:ClassName"), класс должен
+          импортироваться дочерними процессами (определён на уровне модуля)
+        - file_format определяется по расширению файла, если не передан
+        - processes - количество процессов разбора (по умолчанию - количество ядер)
+    """
+    model_class: Type[RedisItem] = import_model(model) if isinstance(model, str) else model
+    file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in FILE_FORMATS:
+        raise Exception(f"Unknown file format {file_format}, expected one of {FILE_FORMATS}...")
+    processes = processes or os.cpu_count() or 1
+    loaded_rows: int = 0
+    try:
+        with open(path, encoding="utf-8", newline="") as file, \
+                ProcessPoolExecutor(max_workers=processes) as executor:
+            records: Iterator[Any] = _read_records(file=file, file_format=file_format)
+            header: Optional[list[str]] = next(records, None) if file_format == "csv" else None
+            in_progress: list[Future] = []
+            for chunk in _read_chunks(records=records, chunk_size=chunk_size):
+                in_progress.append(executor.submit(_prepare_chunk, model_class, file_format, chunk, header))
+                loaded_rows += len(chunk)
+                # Ограничение количества порций в обработке (запись в порядке чтения)
+                if len(in_progress) >= processes * 2:
+                    _execute_commands(orm=orm, commands=in_progress.pop(0).result())
+            for future in in_progress:
+                _execute_commands(orm=orm, commands=future.result())
+        return OperationResult(status=OperationStatus.success, message=f"rows={loaded_rows}")
+    except Exception as exception:
+        orm._on_error_actions(exception=exception)
+        return OperationResult(
+            status=OperationStatus.failed,
+            message=str(exception),
+        )
+
+
+def _execute_commands(orm: RedisORM, commands: list[tuple[str, tuple, dict]]) -> None:
+    """ Запись подготовленных команд одним pipeline """
+    pipe: Any = orm._client.pipeline(transaction=False)
+    for command_name, args, kwargs in commands:
+        getattr(pipe, command_name)(*args, **kwargs)
+    pipe.execute()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Загрузка файла CSV/NDJSON в модель RedisItem",
+    )
+    parser.add_argument("path", help="Путь к файлу")
+    parser.add_argument("--model", required=True, help="Модель в формате module:ClassName")
+    parser.add_argument("--format", dest="file_format", choices=FILE_FORMATS, default=None)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    orm: RedisORM = RedisORM(host=args.host, port=args.port, db=args.db)
+    result: OperationResult = load_file(
+        orm=orm,
+        model=args.model,
+        path=args.path,
+        file_format=args.file_format,
+        processes=args.processes,
+        chunk_size=args.chunk_size,
+    )
+    print(result)
+    if not result.ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+    Lua-скрипты для выполнения выборок на стороне Redis
+
+    Общий формат запроса (ARGV[1] - JSON-список запросов, ARGV[2] - разделитель ключей):
+        {
+            "tables": ["subsystem.3.tag.15"],       # порция префиксов записей (SCAN или индекс диапазонов)
+            "fields": ["date_time", "any_value"],   # возвращаемые поля
+            "predicates": [["any_value", "gt", 10, true]],  # поле, оператор, значение, число?
+            "limit": 0,                             # максимум записей (0 - без ограничения)
+            "aggregate": {"group_by": 1, "limit": 0, "value": true},  # только для AGGREGATE_SCRIPT
+        }
+
+    Скрипты не ищут ключи (KEYS) и обрабатывают только переданную порцию префиксов,
+    поэтому время блокировки Redis ограничено размером порции
+"""
+
+# Общая часть: проверка условий на значения полей
+_COMMON = """
+local delimiter = ARGV[2]
+
+-- Сегмент префикса записи по позиции (нумерация с нуля, как в Meta.table)
+local function segment_of(name, position)
+    local start = 1
+    for _ = 1, position do
+        start = string.find(name, delimiter, start, true) + 1
+    end
+    local finish = string.find(name, delimiter, start, true)
+    return string.sub(name, start, finish and finish - 1 or -1)
+end
+
+local function compare(value, operator, expected, is_number)
+    if not value then return false end
+    if is_number then
+        value = tonumber(value)
+        if value == nil then return false end
+    end
+    if operator == "eq" then return value == expected
+    elseif operator == "gt" then return value > expected
+    elseif operator == "gte" then return value >= expected
+    elseif operator == "lt" then return value < expected
+    elseif operator == "lte" then return value <= expected
+    elseif operator == "in" then
+        for _, item in ipairs(expected) do
+            if value == item then return true end
+        end
+    end
+    return false
+end
+
+-- Значения полей записи, если она удовлетворяет всем условиям (иначе nil)
+local function match_values(query, name)
+    local keys = {}
+    for index, field in ipairs(query.fields) do
+        keys[index] = name .. delimiter .. field
+    end
+    local predicates_offset = #keys
+    for index, predicate in ipairs(query.predicates) do
+        keys[predicates_offset + index] = name .. delimiter .. predicate[1]
+    end
+    if #keys == 0 then return {} end
+    local values = redis.call("MGET", unpack(keys))
+    for index, predicate in ipairs(query.predicates) do
+        if not compare(values[predicates_offset + index], predicate[2], predicate[3], predicate[4]) then
+            return nil
+        end
+    end
+    return values
+end
+"""
+
+# Выборка записей: для каждого запроса плоский список [префикс, значения полей..., ...]
+FETCH_SCRIPT = _COMMON + """
+local queries = cjson.decode(ARGV[1])
+local result = {}
+for query_index, query in ipairs(queries) do
+    local rows = {}
+    local matched = 0
+    for _, name in ipairs(query.tables) do
+        local values = match_values(query, name)
+        local found = false
+        if values then
+            -- Запись без значений полей не существует
+            for index = 1, #query.fields do
+                if values[index] then found = true end
+            end
+        end
+        if found then
+            table.insert(rows, name)
+            for index = 1, #query.fields do
+                table.insert(rows, values[index])
+            end
+            matched = matched + 1
+            if query.limit > 0 and matched >= query.limit then break end
+        end
+    end
+    result[query_index] = rows
+end
+return result
+"""
+
+# Агрегация по первому полю из query.fields (aggregate.value = false - подсчёт записей с этим полем):
+#   для каждого запроса плоский список [группа, count, sum, min, max, ...]
+AGGREGATE_SCRIPT = _COMMON + """
+local queries = cjson.decode(ARGV[1])
+local result = {}
+for query_index, query in ipairs(queries) do
+    local aggregation = query.aggregate
+    local groups = {}
+    local order = {}
+    local matched = 0
+    for _, name in ipairs(query.tables) do
+        local values = match_values(query, name)
+        local value = nil
+        if values and values[1] then
+            if aggregation.value then value = tonumber(values[1]) else value = 0 end
+        end
+        if value then
+            local group = ""
+            if aggregation.group_by >= 0 then group = segment_of(name, aggregation.group_by) end
+            local state = groups[group]
+            if not state then
+                state = {0, 0, value, value}
+                groups[group] = state
+                table.insert(order, group)
+            end
+            state[1] = state[1] + 1
+            state[2] = state[2] + value
+            if value < state[3] then state[3] = value end
+            if value > state[4] then state[4] = value end
+            matched = matched + 1
+            if aggregation.limit > 0 and matched >= aggregation.limit then break end
+        end
+    end
+    local rows = {}
+    for _, group in ipairs(order) do
+        table.insert(rows, group)
+        for index = 1, 4 do
+            -- Числа Lua при возврате в Redis округляются до целых, поэтому передаются строкой
+            table.insert(rows, string.format("%.17g", groups[group][index]))
+        end
+    end
+    result[query_index] = rows
+end
+return result
+"""
@@ -0,0 +1,131 @@
+"""
+    Перенос записей модели на новую схему ключей (Meta.aliases, Meta.packed_keys)
+
+    Исходная и новая модели описывают одни и те же поля и параметры Meta.table,
+    отличаются только способом формирования ключей. Префиксы записей исходной
+    модели собираются до начала записи (новые ключи могут подходить под паттерн
+    исходной модели), затем записи переносятся пакетами: запись в новом формате
+    и удаление старых ключей выполняются одним pipeline.
+
+    API:
+        from storage_orm.redis_impl.migration import migrate_keys
+        migrate_keys(source=ExampleItem, target=CompactExampleItem, db_instance=redis_client)
+
+    CLI:
+        python -m storage_orm.redis_impl.migration --source examples.models:ExampleItem \\
+            --target examples.models:CompactExampleItem --host localhost --port 8379 --db 1
+"""
+from __future__ import annotations
+import redis
+import logging
+import argparse
+from typing import Any
+from typing import Type
+from typing import Union
+from typing import Optional
+
+from .redis_item import RedisItem
+from .loader import import_model
+from ..operation_result import OperationResult
+from ..operation_result import OperationStatus
+
+
+def migrate_keys(
+    source: Union[Type[RedisItem], str],
+    target: Union[Type[RedisItem], str],
+    db_instance: Optional[redis.Redis] = None,
+    batch_size: int = 1_000,
+) -> OperationResult:
+    """
+        Перенос всех записей source в формат ключей target
+        - модели передаются классами или путями к ним ("module:ClassName")
+        - db_instance - подключение (по умолчанию - глобальное подключение RedisItem)
+    """
+    source_class: Type[RedisItem] = import_model(source) if isinstance(source, str) else source
+    target_class: Type[RedisItem] = import_model(target) if isinstance(target, str) else target
+    if list(source_class.__annotations__) != list(target_class.__annotations__) \
+            or source_class._table_keys != target_class._table_keys:
+        raise Exception(f"{source_class.__name__} and {target_class.__name__} must have the same fields...")
+    db_instance = db_instance or RedisItem._db_instance
+    if not db_instance:
+        raise Exception("Redis database not connected...")
+    try:
+        tables: dict[str, None] = {}
+        state: dict = {}
+        patterns: list[str] = source_class._get_table_patterns(table_kwargs={})
+        while not state.get("done"):
+            tables.update(dict.fromkeys(source_class._next_scan_candidates(
+                db_instance=db_instance,
+                state=state,
+                patterns=patterns,
+                count=batch_size,
+            )))
+        migrated_count: int = 0
+        tables_list: list[str] = list(tables)
+        for batch_start in range(0, len(tables_list), batch_size):
+            items: list[RedisItem] = source_class._objects_from_tables(
+                db_instance=db_instance,
+                tables=[table.encode() for table in tables_list[batch_start:batch_start + batch_size]],
+                fields=list(source_class.__annotations__),
+            )
+            pipe: Any = db_instance.pipeline(transaction=False)
+            for item in items:
+                _migrate_item(pipe=pipe, item=item, target_class=target_class)
+            pipe.execute()
+            migrated_count += len(items)
+        return OperationResult(status=OperationStatus.success, message=f"items={migrated_count}")
+    except Exception as exception:
+        logging.exception(exception)
+        return OperationResult(
+            status=OperationStatus.failed,
+            message=str(exception),
+        )
+
+
+def _migrate_item(pipe: Any, item: RedisItem, target_class: Type[RedisItem]) -> None:
+    """
+        Команды записи объекта в новом формате и удаления ключей, которые не используются новым форматом
+        - переносятся только присутствующие в записи поля
+        - значения и индексы диапазонов записываются без записи в поток изменений (Meta.stream):
+          перенос не является изменением объекта
+    """
+    values: dict[str, Any] = {field: value for field, value in item._params.items() if value is not None}
+    target_item: RedisItem = target_class(**(item._table_args_from_table(table=item._table) | values))
+    target_mapping: dict[str, Any] = {key: value for key, value in target_item.mapping.items() if value is not None}
+    pipe.mset(mapping=target_mapping)
+    for index_key, score in target_item.range_mapping.items():
+        pipe.zadd(index_key, {target_item._table: score})
+    source_keys: set[str] = {key for key, value in item.mapping.items() if value is not None}
+    stale_keys: set[str] = source_keys - set(target_mapping)
+    if stale_keys:
+        pipe.delete(*stale_keys)
+    if item._table != target_item._table:
+        for index_key in item.range_mapping:
+            pipe.zrem(index_key, item._table)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Перенос записей модели RedisItem на новую схему ключей",
+    )
+    parser.add_argument("--source", required=True, help="Исходная модель в формате module:ClassName")
+    parser.add_argument("--target", required=True, help="Новая модель в формате module:ClassName")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    result: OperationResult = migrate_keys(
+        source=args.source,
+        target=args.target,
+        db_instance=redis.Redis(host=args.host, port=args.port, db=args.db),
+        batch_size=args.batch_size,
+    )
+    print(result)
+    if not result.ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import itertools
+from typing import Any
+from typing import Type
+from typing import Union
+from typing import Generic
+from typing import TypeVar
+from typing import Iterator
+from typing import Optional
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .redis_item import RedisItem
+
+T = TypeVar('T', bound='RedisItem')
+
+
+class QuerySet(Generic[T]):
+    """
+        Ленивая выборка объектов модели
+        - запрос к БД выполняется только во время итерации
+        - методы filter/only/limit/order_by возвращают новый QuerySet, например:
+
+            ExampleItem.objects.filter(subsystem_id=3).only("any_value").limit(10)
+
+        - срезы и first() прекращают сканирование после получения нужного
+          количества объектов
+        - полученные объекты кэшируются, повторная итерация не обращается к БД
+        - defer_decoding() - типы полей приводятся при первом обращении к атрибуту
+    """
+    model: Type[T]
+    _kwargs: dict
+    _items: Optional[list[T]]
+    _fields: Optional[tuple[str, ...]]
+    _offset: int
+    _limit: Optional[int]
+    _order_by: tuple[str, ...]
+    _lazy: bool
+    _result_cache: list[T]
+    _source: Optional[Iterator[T]]
+    _done: bool
+
+    def __init__(
+        self,
+        model: Type[T],
+        kwargs: Optional[dict] = None,
+        items: Optional[list[T]] = None,
+        lazy: bool = False,
+    ) -> None:
+        self.model = model
+        self._kwargs = kwargs or {}
+        self._items = items
+        self._lazy = lazy
+        self._fields = None
+        self._offset = 0
+        self._limit = None
+        self._order_by = ()
+        self._result_cache = []
+        self._source = None
+        self._done = False
+
+    def _clone(self, **attrs: Any) -> QuerySet[T]:
+        """ Копия выборки (без кэша результатов) с изменёнными параметрами """
+        clone: QuerySet[T] = self.__class__(
+            model=self.model,
+            kwargs=dict(self._kwargs),
+            items=self._items,
+            lazy=self._lazy,
+        )
+        clone._fields = self._fields
+        clone._offset = self._offset
+        clone._limit = self._limit
+        clone._order_by = self._order_by
+        for name, value in attrs.items():
+            setattr(clone, name, value)
+        return clone
+
+    def filter(self, **kwargs) -> QuerySet[T]:
+        """ Добавление условий фильтра (аргументы как у RedisItem.filter) """
+        if self._offset or self._limit is not None:
+            raise Exception("Cannot filter a query once a slice has been taken...")
+        return self._clone(_kwargs=self._kwargs | kwargs)
+
+    def only(self, *fields: str) -> QuerySet[T]:
+        """ Получение только перечисленных полей (остальные поля объектов не заполняются) """
+        unknown_fields: set[str] = set(fields) - set(self.model.__annotations__)
+        if unknown_fields:
+            raise Exception(f"{self.model.__name__}.only() unknown fields {unknown_fields}...")
+        return self._clone(_fields=fields)
+
+    def defer_decoding(self) -> QuerySet[T]:
+        """ Объекты хранят полученные байты, тип поля приводится при первом обращении к атрибуту """
+        return self._clone(_lazy=True)
+
+    def limit(self, count: int) -> QuerySet[T]:
+        """ Ограничение количества объектов """
+        return self[:count]
+
+    def order_by(self, *fields: str) -> QuerySet[T]:
+        """
+            Сортировка по полям модели ("-" перед именем - по убыванию)
+            Для сортировки необходимо получить все объекты выборки
+        """
+        if self._offset or self._limit is not None:
+            raise Exception("Cannot reorder a query once a slice has been taken...")
+        return self._clone(_order_by=fields)
+
+    def first(self) -> Optional[T]:
+        """ Первый объект выборки (сканирование прекращается после первого найденного) """
+        if self._result_cache or self._done:
+            return next(iter(self), None)
+        return next(iter(self.limit(1)), None)
+
+    def count(self) -> int:
+        """ Количество объектов (без получения объектов, если выборка ещё не выполнялась) """
+        if self._done:
+            return len(self._result_cache)
+        if self._items or (not self._kwargs.keys() - {"_consistent"} and self._limit is not None):
+            # Выборка без фильтра допустима только со срезом - подсчёт по полученным объектам
+            return len(list(self))
+        total: int = max(self.model.count(**self._kwargs) - self._offset, 0)
+        return total if self._limit is None else min(total, self._limit)
+
+    def exists(self) -> bool:
+        return self.first() is not None
+
+    def _fetch(self) -> Iterator[T]:
+        """ Выполнение запроса к БД с применением сортировки и среза """
+        if not self._kwargs.keys() - {"_consistent"} and not self._items and self._limit is None:
+            raise Exception(f"{self.model.__name__}.objects has empty filter. OOM possible.")
+        stop: Optional[int] = None if self._limit is None else self._offset + self._limit
+        objects: Iterator[T] = self.model._iterate_objects(
+            kwargs=self._kwargs,
+            items=self._items,
+            fields=self._fields,
+            # Без сортировки количество объектов ограничивается на стороне БД
+            limit=None if self._order_by else stop,
+            lazy=self._lazy,
+        )
+        if self._order_by:
+            sorted_objects: list[T] = list(objects)
+            # Устойчивая сортировка, начиная с последнего поля
+            for field in reversed(self._order_by):
+                sorted_objects.sort(
+                    key=lambda item: getattr(item, field.lstrip("-")),
+                    reverse=field.startswith("-"),
+                )
+            objects = iter(sorted_objects)
+        return itertools.islice(objects, self._offset, stop)
+
+    def __iter__(self) -> Iterator[T]:
+        position: int = 0
+        while True:
+            if position < len(self._result_cache):
+                yield self._result_cache[position]
+                position += 1
+                continue
+            if self._done:
+                return
+            if self._source is None:
+                self._source = self._fetch()
+            try:
+                self._result_cache.append(next(self._source))
+            except StopIteration:
+                self._done = True
+                self._source = None
+
+    def __len__(self) -> int:
+        for _ in self:
+            pass
+        return len(self._result_cache)
+
+    def __bool__(self) -> bool:
+        return self.first() is not None
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[T, QuerySet[T]]:
+        if isinstance(key, int):
+            if key < 0:
+                raise Exception("Negative indexing is not supported...")
+            found: Optional[T] = self[key:key + 1].first()
+            if found is None:
+                raise IndexError(f"{self.__class__.__name__} index out of range")
+            return found
+        if (key.start or 0) < 0 or (key.stop is not None and key.stop < 0) or key.step not in (None, 1):
+            raise Exception("Negative indexing and steps are not supported...")
+        start: int = key.start or 0
+        offset: int = self._offset + start
+        limit: Optional[int] = self._limit
+        if key.stop is not None:
+            limit = max(key.stop - start, 0) if limit is None else max(min(key.stop, limit) - start, 0)
+        elif limit is not None:
+            limit = max(limit - start, 0)
+        return self._clone(_offset=offset, _limit=limit)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class QuerySetDescriptor:
+    """ Доступ к выборке через класс модели: ExampleItem.objects.filter(...) """
+
+    def __get__(self, instance: Any, owner: Type[T]) -> QuerySet[T]:
+        return QuerySet(model=owner)
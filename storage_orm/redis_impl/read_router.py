@@ -0,0 +1,45 @@
+from __future__ import annotations
+import redis
+import random
+import itertools
+import threading
+from typing import Iterator
+
+READ_POLICIES: tuple[str, ...] = ("round_robin", "random")
+
+
+class ReadRouter:
+    """
+        Распределение чтений (filter/get/count/aggregate/paginate) между репликами
+        - запись всегда выполняется через основное подключение (primary)
+        - read_policy: "round_robin" - по очереди, "random" - случайная реплика
+        - consistent=True - чтение с primary (например, сразу после записи)
+    """
+    primary: redis.Redis
+    replicas: list[redis.Redis]
+    read_policy: str
+    _cycle: Iterator[redis.Redis]
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        primary: redis.Redis,
+        replicas: list[redis.Redis],
+        read_policy: str = "round_robin",
+    ) -> None:
+        if read_policy not in READ_POLICIES:
+            raise Exception(f"Unknown read_policy {read_policy}, expected one of {READ_POLICIES}...")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.read_policy = read_policy
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def get_client(self, consistent: bool = False) -> redis.Redis:
+        """ Подключение для очередного чтения """
+        if consistent or not self.replicas:
+            return self.primary
+        if self.read_policy == "random":
+            return random.choice(self.replicas)
+        with self._lock:
+            return next(self._cycle)
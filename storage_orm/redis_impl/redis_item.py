@@ -1,15 +1,30 @@
 from __future__ import annotations
 import re
+import sys
 import copy
+import json
+import base64
 import redis
+import logging
 import itertools
+from fnmatch import fnmatchcase
 from typing import Any
 from typing import cast
+from typing import Optional
 from typing import Union
 from typing import Mapping
 from typing import Type
 from typing import TypeVar
+from typing import Callable
+from typing import Iterator
 
+from .lua_scripts import FETCH_SCRIPT
+from .lua_scripts import AGGREGATE_SCRIPT
+from .write_behind import WriteBehindBuffer
+from .query_set import QuerySet
+from .query_set import QuerySetDescriptor
+from .subscription import Subscription
+from .read_router import ReadRouter
 from ..storage_item import StorageItem
 from ..operation_result import OperationResult
 from ..operation_result import OperationStatus
@@ -25,16 +40,58 @@ ResponseT = Any
 T = TypeVar('T', bound='RedisItem')
 IN_PREFIX = "__in"
 KEYS_DELIMITER = "."
+KEYS_DELIMITER_BYTES = KEYS_DELIMITER.encode()
+# Количество ключей/записей, обрабатываемых за одно обращение к БД при сканировании
+SCAN_BATCH_SIZE = 1_000
+# Префикс ключей сортированных множеств (ZSET) для индексов диапазонов
+RANGE_INDEX_PREFIX = "__range__"
+# Префикс ключей потоков (Redis Stream) изменений моделей (Meta.stream = True)
+STREAM_PREFIX = "__stream__"
+# Поле записи потока с префиксом записи объекта
+STREAM_TABLE_FIELD = "__table__"
+# Ограничение длины потока по умолчанию (хранятся последние записи)
+STREAM_MAXLEN = 100_000
+# Алфавит упакованных целочисленных параметров Meta.table (Meta.packed_keys)
+PACKED_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+# Операторы сравнения для полей, указанных в Meta.range_index
+RANGE_OPERATORS: dict[str, str] = {
+    "__gte": "min",
+    "__gt": "min",
+    "__lte": "max",
+    "__lt": "max",
+}
+# Операторы сравнения значений полей, выполняемые на стороне Redis (Lua)
+FIELD_OPERATORS: tuple[str, ...] = ("eq", "gt", "gte", "lt", "lte", "in")
+# Операции агрегации, выполняемые на стороне Redis
+AGGREGATE_OPERATIONS: tuple[str, ...] = ("count", "sum", "min", "max", "avg")
 
 
 class RedisItem(StorageItem):
     _table: str
     _table_keys: dict[str, int]
+    _storage_table: str
+    _field_keys: dict[str, str] = {}
+    # Разбор ответов БД: имя поля в ключе -> (имя поля модели, приведение типа)
+    _field_decoders: dict[bytes, tuple[str, Callable[[bytes], Any]]] = {}
+    _packed_keys: tuple[str, ...] = ()
     _params: Mapping[_Key, _Value]
+    _range_index: tuple[str, ...] = ()
+    _range_partition: tuple[str, ...] = ()
+    _stream_maxlen: int = 0
     _db_instance: Union[redis.Redis, None] = None
+    _write_buffer: Union[WriteBehindBuffer, None] = None
+    _read_router: Union[ReadRouter, None] = None
+    # Ленивая выборка: ExampleItem.objects.filter(...).limit(10)
+    objects = QuerySetDescriptor()
 
     class Meta:
         table = ""  # Pattern имени записи, например, "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ()  # Числовые поля, индексируемые в ZSET, например, ("date_time",)
+        range_index_partition = ()  # Параметры Meta.table для разделов индекса, например, ("subsystem_id",)
+        stream = False  # Запись изменений в Redis Stream для RedisItem.subscribe()
+        stream_maxlen = STREAM_MAXLEN  # Приблизительная максимальная длина потока
+        aliases = {}  # Короткие имена сегментов Meta.table и полей в ключах, например, {"subsystem": "s"}
+        packed_keys = ()  # Целочисленные параметры Meta.table, хранимые в base62, например, ("tag_id",)
 
     def __init_subclass__(cls) -> None:
         cls._table_keys = {
@@ -42,34 +99,104 @@ class RedisItem(StorageItem):
                 for key, index in enumerate(cls.Meta.table.split(KEYS_DELIMITER))
                     if index.startswith("{") and index.endswith("}")
         }
+        cls._range_index = tuple(getattr(cls.Meta, "range_index", ()))
+        cls._range_partition = tuple(getattr(cls.Meta, "range_index_partition", ()))
+        if set(cls._range_partition) - set(cls._table_keys):
+            raise Exception(f"{cls.__name__}.Meta.range_index_partition must contain Meta.table keys only...")
+        cls._stream_maxlen = getattr(cls.Meta, "stream_maxlen", STREAM_MAXLEN) if getattr(cls.Meta, "stream", False) else 0
+        # Сокращение имён в ключах БД: неизменяемые сегменты Meta.table и имена полей
+        aliases: dict[str, str] = dict(getattr(cls.Meta, "aliases", {}))
+        if len(set(aliases.values())) != len(aliases):
+            raise Exception(f"{cls.__name__}.Meta.aliases values must be unique...")
+        if any(KEYS_DELIMITER in alias or re.search(r"[*?\[\]{}]", alias) for alias in aliases.values()):
+            raise Exception(f"{cls.__name__}.Meta.aliases values must not contain delimiter or patterns...")
+        cls._field_keys = {field: alias for field, alias in aliases.items() if field in cls.__annotations__}
+        if set(cls._field_keys.values()) & (set(cls.__annotations__) - set(cls._field_keys)):
+            raise Exception(f"{cls.__name__}.Meta.aliases values must not match field names...")
+        cls._storage_table = KEYS_DELIMITER.join(
+            segment if segment.startswith("{") else aliases.get(segment, segment)
+                for segment in cls.Meta.table.split(KEYS_DELIMITER)
+        )
+        cls._packed_keys = tuple(getattr(cls.Meta, "packed_keys", ()))
+        cls._field_decoders = cls._make_field_decoders()
 
     @classmethod
-    def _make_kwargs_from_objects(cls: Type[T], objects: list[T]) -> dict:
+    def _make_field_decoders(cls: Type[T]) -> dict[bytes, tuple[str, Callable[[bytes], Any]]]:
         """
-            Конкатенация атрибутов объектов и их подготовка для
-                использования в качестве фильтров
+            Приведение типов полей без промежуточных строк: int/float принимают bytes,
+              имена полей интернируются (одни и те же объекты во всех экземплярах)
         """
-        result_kwargs: dict = {}
-        for obj in objects:
-            for key, position in obj._table_keys.items():
-                value: str = obj._table.split(KEYS_DELIMITER)[position]
-                if key in result_kwargs:
-                    result_kwargs[key] += str(value)
-                else:
-                    result_kwargs[key] = str(value)
+        return {
+            cls._field_key(field=field).encode(): (
+                sys.intern(field),
+                bytes.decode if field_type is str else field_type,
+            )
+                for field, field_type in cls.__annotations__.items()
+        }
+
+    @classmethod
+    def _field_key(cls: Type[T], field: str) -> str:
+        """ Имя поля в ключе БД (с учётом Meta.aliases) """
+        return cls._field_keys.get(field, field)
 
-        for key in result_kwargs.keys():
-            result_kwargs[key] = f"[{result_kwargs[key]}]"
+    @staticmethod
+    def _pack_value(value: Any) -> str:
+        """ Упаковка целого числа в строку base62, например, 3844 -> "100" """
+        number: int = int(value)
+        sign: str = "-" if number < 0 else ""
+        number = abs(number)
+        packed: str = ""
+        while True:
+            number, remainder = divmod(number, len(PACKED_ALPHABET))
+            packed = PACKED_ALPHABET[remainder] + packed
+            if not number:
+                return sign + packed
 
-        print(f"{result_kwargs=}")
+    @staticmethod
+    def _unpack_value(packed: str) -> str:
+        """ Распаковка строки base62 в десятичную запись числа """
+        number: int = 0
+        for char in packed.lstrip("-"):
+            number = number * len(PACKED_ALPHABET) + PACKED_ALPHABET.index(char)
+        return f"-{number}" if packed.startswith("-") else str(number)
 
-        return result_kwargs
+    @classmethod
+    def _pack_table_kwargs(cls: Type[T], kwargs: dict) -> dict:
+        """ Упаковка значений параметров Meta.packed_keys """
+        if not cls._packed_keys:
+            return kwargs
+        return {
+            key: cls._pack_value(value) if key in cls._packed_keys else value
+                for key, value in kwargs.items()
+        }
+
+    @classmethod
+    def _table_args_from_table(cls: Type[T], table: str, values_cache: Optional[dict[str, str]] = None) -> dict[str, str]:
+        """
+            Значения параметров Meta.table из префикса записи в БД
+            values_cache - общий для пакета записей словарь: одинаковые значения
+              параметров разных записей хранятся одним объектом строки
+        """
+        src_values: list[str] = table.split(KEYS_DELIMITER)
+        table_args: dict[str, str] = {}
+        for key, position in cls._table_keys.items():
+            value: str = cls._unpack_value(src_values[position]) if key in cls._packed_keys else src_values[position]
+            table_args[key] = value if values_cache is None else values_cache.setdefault(value, value)
+        return table_args
+
+    @classmethod
+    def _make_kwargs_from_objects(cls: Type[T], objects: list[T]) -> list[dict]:
+        """
+            Подготовка параметров Meta.table объектов для
+                использования в качестве фильтров (по словарю на объект)
+        """
+        return [obj._table_args_from_table(table=obj._table) for obj in objects]
 
     def __init__(self, **kwargs) -> None:
         # Формирование полей модели из переданных дочернему классу аргументов
         [self.__dict__.__setitem__(key, value) for key, value in kwargs.items()]
         # Формирование изолированной среды с данными класса для дальнейшей работы с БД
-        self._table = self.__class__.Meta.table.format(**kwargs)
+        self._table = self.__class__._storage_table.format(**self.__class__._pack_table_kwargs(kwargs=kwargs))
         self._params = {
             key: kwargs.get(key, None)
                 for key in self.__class__.__annotations__
@@ -78,82 +205,777 @@ class RedisItem(StorageItem):
         self.using = self.instance_using  # type: ignore
 
     def __getattr__(self, attr_name: str):
+        # Отложенное приведение типа поля при первом обращении (см. filter(_lazy=True))
+        raw_fields: Optional[dict[str, bytes]] = self.__dict__.get("_raw_fields")
+        if raw_fields and attr_name in raw_fields:
+            return self._decode_raw_field(field=attr_name)
         return object.__getattribute__(self, attr_name)
 
+    def _decode_raw_field(self, field: str) -> Any:
+        """ Приведение типа отложенного поля с сохранением результата в объекте """
+        _, decoder = self._field_decoders[self._field_key(field=field).encode()]
+        value: Any = decoder(self.__dict__["_raw_fields"].pop(field))
+        self._params[field] = value  # type: ignore
+        # Значение, присвоенное атрибуту до первого чтения, не перезаписывается
+        return self.__dict__.setdefault(field, value)
+
+    def _decode_raw_fields(self) -> None:
+        """ Приведение типов всех ещё не прочитанных полей (для операций с объектом целиком) """
+        for field in list(self.__dict__.get("_raw_fields") or ()):
+            self._decode_raw_field(field=field)
+
     @classmethod
     def _set_global_instance(cls: Type[T], db_instance: redis.Redis) -> None:
         """ Установка глобальной ссылки на БД во время первого подключения """
         cls._db_instance = db_instance
 
     @classmethod
-    def get(cls: Type[T], _items: list[T] = None, **kwargs) -> T:
+    def _set_global_write_buffer(cls: Type[T], write_buffer: Optional[WriteBehindBuffer]) -> None:
+        """ Установка глобального буфера отложенной записи (для глобального подключения) """
+        cls._write_buffer = write_buffer
+
+    @classmethod
+    def _set_global_read_router(cls: Type[T], read_router: Optional[ReadRouter]) -> None:
+        """ Установка глобального распределения чтений по репликам (для глобального подключения) """
+        cls._read_router = read_router
+
+    @classmethod
+    def _get_read_client(cls: Type[T], kwargs: dict) -> tuple[redis.Redis, dict]:
+        """
+            Подключение для чтения и фильтры без служебного аргумента _consistent
+            - реплика, если для подключения модели настроено распределение чтений
+            - _consistent=True - чтение с основного подключения
+        """
+        if not cls._db_instance:
+            raise Exception("Redis database not connected...")
+        filters: dict = {key: value for key, value in kwargs.items() if key != "_consistent"}
+        if cls._read_router is not None and cls._read_router.primary is cls._db_instance:
+            return cls._read_router.get_client(consistent=kwargs.get("_consistent", False)), filters
+        return cls._db_instance, filters
+
+    @classmethod
+    def get(cls: Type[T], _items: list[T] = None, _lazy: bool = False, **kwargs) -> T:
         """
             Получение одного объекта по выбранному фильтру
 
                 StorageItem.get(subsystem_id=10, tag_id=55)
         """
-        result_list: list[T] = cls.filter(_items=_items, kwargs=kwargs)
+        # Сканирование прекращается после второго найденного объекта (ограничение передаётся в БД)
+        result_list: list[T] = list(cls.filter(_items=_items, _lazy=_lazy, **kwargs)[:2])
         if not result_list:
-            raise NotFoundException(f"{T} item not found...")
+            raise NotFoundException(f"{cls.__name__} item not found...")
         if len(result_list) > 1:
-            raise MoreThanOneFoundException(f"{T} multiple items found...")
+            raise MoreThanOneFoundException(f"{cls.__name__} multiple items found...")
 
         return result_list[0]
 
     @classmethod
-    def filter(cls: Type[T], _items: list[T] = None, **kwargs) -> list[T]:
+    def filter(cls: Type[T], _items: list[T] = None, _lazy: bool = False, **kwargs) -> QuerySet[T]:
         """
             Получение объектов по фильтру переданных аргументов, например:
 
-                StorageItem.get(subsystem_id=10, tag_id=55)
-                StorageItem.get(subsystem_id__in=[10, 47], tag_id=55)
+                StorageItem.filter(subsystem_id=10, tag_id=55)
+                StorageItem.filter(subsystem_id__in=[10, 47], tag_id=55)
+                StorageItem.filter(_items=[another_item])
+
+            Возвращается ленивая выборка (QuerySet), запрос выполняется во время итерации
+            _lazy=True - объекты хранят полученные байты, тип поля приводится при первом
+              обращении к атрибуту
+            _consistent=True - чтение с основного подключения, а не с реплики
         """
         if not cls._db_instance:
             raise Exception("Redis database not connected...")
-        if not len(kwargs) and not _items:
+        if not len(kwargs.keys() - {"_consistent"}) and not _items:
             raise Exception(f"{cls.__name__}.get() has empty filter. OOM possible.")
-        # Формирование списка фильтров для возможности поиска входящих в список
-        filters_list: list[str] = cls._get_filters_by_kwargs(kwargs=kwargs)
+        return QuerySet(model=cls, kwargs=kwargs, items=_items, lazy=_lazy)
+
+    @classmethod
+    def _iterate_objects(
+        cls: Type[T],
+        kwargs: dict,
+        items: Optional[list[T]] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        limit: Optional[int] = None,
+        lazy: bool = False,
+    ) -> Iterator[T]:
+        """
+            Последовательное получение объектов из БД порциями префиксов записей:
+                - порции берутся из индекса диапазонов (ZRANGEBYSCORE) или SCAN
+                  (переданы все параметры Meta.table - префиксы известны без сканирования)
+                - условия на значения полей проверяются Lua-скриптом только для
+                  полученной порции, без условий значения получаются через MGET
+                - при limit порция не превышает количество недостающих объектов
+        """
+        db_instance, kwargs = cls._get_read_client(kwargs=kwargs)
+        table_kwargs, range_bounds, predicates = cls._prepare_filters(kwargs=kwargs)
+        fields_list: list[str] = list(fields or cls.__annotations__)
+        query: Optional[dict] = cls._make_script_query(predicates=predicates, fields=fields_list) if predicates else None
+        found_count: int = 0
+        for tables in cls._iterate_candidates(
+            db_instance=db_instance,
+            table_kwargs=table_kwargs,
+            range_bounds=range_bounds,
+            items=items,
+            limit=limit,
+        ):
+            while tables:
+                if query is None:
+                    # SCAN может вернуть больше ключей, чем count - MGET только недостающих
+                    chunk: list[str] = tables[:limit - found_count] if limit else tables
+                    objects: list[T] = cls._objects_from_tables(
+                        db_instance=db_instance,
+                        tables=[table.encode() for table in chunk],
+                        fields=fields_list,
+                        lazy=lazy,
+                    )
+                else:
+                    chunk = tables
+                    objects = cls._fetch_tables(
+                        db_instance=db_instance,
+                        query=query | {"tables": chunk, "limit": limit - found_count if limit else 0},
+                        lazy=lazy,
+                    )
+                tables = tables[len(chunk):]
+                yield from objects
+                found_count += len(objects)
+                if limit and found_count >= limit:
+                    return
+
+    @classmethod
+    def _prepare_filters(cls: Type[T], kwargs: dict) -> tuple[dict, dict[str, list[str]], list[tuple]]:
+        """
+            Разделение аргументов фильтра для обхода порциями:
+                - параметры Meta.table
+                - границы индекса диапазонов первого поля (источник порций префиксов записей)
+                - условия на значения полей, включая границы остальных индексов диапазонов
+        """
+        table_kwargs, range_kwargs, predicates = cls._split_kwargs(kwargs=kwargs)
+        range_bounds: dict[str, list[str]] = cls._get_range_bounds(range_kwargs=range_kwargs)
+        if len(range_bounds) > 1:
+            range_field: str = next(iter(range_bounds))
+            range_bounds = {range_field: range_bounds[range_field]}
+            for key, value in range_kwargs.items():
+                field, _, operator = key.rpartition("__")
+                if field != range_field:
+                    predicates.append((field, operator, value))
+        return table_kwargs, range_bounds, predicates
+
+    @classmethod
+    def _iterate_candidates(
+        cls: Type[T],
+        db_instance: redis.Redis,
+        table_kwargs: dict,
+        range_bounds: dict[str, list[str]],
+        items: Optional[list[T]] = None,
+        count: int = SCAN_BATCH_SIZE,
+        limit: Optional[int] = None,
+    ) -> Iterator[list[str]]:
+        """
+            Порции префиксов записей-кандидатов (без повторов): из индекса диапазонов
+              с отбором по параметрам Meta.table или из SCAN по паттернам префиксов
+            - limit ограничивает порцию индекса диапазонов, если префиксы не отбираются
+              по паттернам (COUNT у SCAN - количество просматриваемых ключей, а не
+              найденных, поэтому порция SCAN не уменьшается)
+        """
+        patterns: list[str] = cls._get_table_patterns(table_kwargs=table_kwargs, items=items)
+        state: dict = {}
+        seen: set[str] = set()
+        range_patterns: list[str] = patterns if table_kwargs or items else []
+        range_count: int = min(limit, count) if limit and not range_patterns else count
+        while not state.get("done"):
+            if range_bounds:
+                candidates: list[str] = cls._next_range_candidates(
+                    db_instance=db_instance,
+                    state=state,
+                    range_bounds=range_bounds,
+                    patterns=range_patterns,
+                    count=range_count,
+                    table_kwargs=table_kwargs,
+                )
+            else:
+                candidates = cls._next_scan_candidates(
+                    db_instance=db_instance,
+                    state=state,
+                    patterns=patterns,
+                    count=count,
+                )
+            # SCAN может вернуть один ключ несколько раз
+            candidates = [table for table in candidates if table not in seen]
+            seen.update(candidates)
+            if candidates:
+                yield candidates
+
+    @classmethod
+    def paginate(
+        cls: Type[T],
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        **kwargs,
+    ) -> tuple[list[T], Optional[str]]:
+        """
+            Постраничное получение объектов, например:
+
+                items, cursor = StorageItem.paginate(page_size=50, subsystem_id=10)
+                next_items, cursor = StorageItem.paginate(page_size=50, cursor=cursor, subsystem_id=10)
+
+            - возвращается страница объектов и токен следующей страницы (None - страниц больше нет)
+            - токен не зависит от процесса, для продолжения передаются те же фильтры
+            - стоимость страницы пропорциональна её размеру: префиксы записей берутся
+              порциями из SCAN или индекса диапазонов, условия на значения полей
+              проверяются Lua-скриптом только для полученных порций
+            - при изменении данных во время обхода записи могут повторяться (гарантии SCAN)
+        """
+        db_instance, kwargs = cls._get_read_client(kwargs=kwargs)
+        table_kwargs, range_bounds, predicates = cls._prepare_filters(kwargs=kwargs)
+        patterns: list[str] = cls._get_table_patterns(table_kwargs=table_kwargs)
+        state: dict = cls._decode_cursor(cursor=cursor)
+        if cls._read_router is not None and db_instance in cls._read_router.replicas:
+            # Курсор SCAN действителен только для сервера, с которого он получен
+            replicas: list[redis.Redis] = cls._read_router.replicas
+            state.setdefault("n", replicas.index(db_instance))
+            db_instance = replicas[state["n"] % len(replicas)]
+        candidates: list[str] = state.pop("r", [])
         result: list[T] = []
-        for filter in filters_list:
-            keys: list[bytes] = cls._db_instance.keys(pattern=filter)
-            values: list[bytes] = cast(list[bytes], cls._db_instance.mget(keys))
-            result += cls._objects_from_db_items(items=dict(zip(keys, values)))
+        while len(result) < page_size:
+            if not candidates and not state.get("done"):
+                if range_bounds:
+                    candidates = cls._next_range_candidates(
+                        db_instance=db_instance,
+                        state=state,
+                        range_bounds=range_bounds,
+                        patterns=patterns if table_kwargs else [],
+                        count=page_size,
+                        table_kwargs=table_kwargs,
+                    )
+                else:
+                    candidates = cls._next_scan_candidates(
+                        db_instance=db_instance,
+                        state=state,
+                        patterns=patterns,
+                        count=page_size,
+                    )
+                continue
+            if not candidates:
+                break
+            # Проверяется не больше префиксов, чем осталось до заполнения страницы
+            chunk: list[str] = candidates[:page_size - len(result)]
+            candidates = candidates[len(chunk):]
+            if predicates:
+                query: dict = cls._make_script_query(predicates=predicates)
+                result += cls._fetch_tables(db_instance=db_instance, query=query | {"tables": chunk})
+            else:
+                result += cls._objects_from_tables(
+                    db_instance=db_instance,
+                    tables=[table.encode() for table in chunk],
+                    fields=list(cls.__annotations__),
+                )
+        if state.get("done") and not candidates:
+            return result, None
+        return result, cls._encode_cursor(state=state | {"r": candidates})
+
+    @staticmethod
+    def _encode_cursor(state: dict) -> str:
+        """ Токен продолжения выборки (base64 от JSON-состояния) """
+        return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> dict:
+        if not cursor:
+            return {}
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError as exception:
+            raise Exception(f"Invalid pagination cursor: {exception}...")
+
+    @classmethod
+    def _next_scan_candidates(
+        cls: Type[T],
+        db_instance: redis.Redis,
+        state: dict,
+        patterns: list[str],
+        count: int,
+    ) -> list[str]:
+        """
+            Очередная порция префиксов записей из SCAN
+                state: {"p": номер паттерна, "c": курсор SCAN, "done": обход завершён}
+        """
+        pattern_index: int = state.get("p", 0)
+        if pattern_index >= len(patterns):
+            state["done"] = True
+            return []
+        pattern: str = patterns[pattern_index]
+        if not any(char in pattern for char in "*?["):
+            # Паттерны без подстановок - префиксы записей известны, берутся подряд до count
+            tables: list[str] = []
+            while pattern_index < len(patterns) and len(tables) < count \
+                    and not any(char in patterns[pattern_index] for char in "*?["):
+                tables.append(patterns[pattern_index])
+                pattern_index += 1
+            state["p"], state["c"] = pattern_index, 0
+            return tables
+        anchor: str = KEYS_DELIMITER + cls._field_key(field=next(iter(cls.__annotations__)))
+        scan_cursor, keys = db_instance.scan(cursor=state.get("c", 0), match=pattern + anchor, count=count)
+        if scan_cursor == 0:
+            state["p"], state["c"] = pattern_index + 1, 0
+        else:
+            state["c"] = scan_cursor
+        return list(dict.fromkeys(key.decode()[:-len(anchor)] for key in keys))
+
+    @classmethod
+    def _next_range_candidates(
+        cls: Type[T],
+        db_instance: redis.Redis,
+        state: dict,
+        range_bounds: dict[str, list[str]],
+        patterns: list[str],
+        count: int,
+        table_kwargs: Optional[dict] = None,
+    ) -> list[str]:
+        """
+            Очередная порция префиксов записей из индекса диапазонов
+                state: {"s": последний полученный score, "k": количество полученных записей с этим score}
+        """
+        field, (min_score, max_score) = next(iter(range_bounds.items()))
+        if "s" in state:
+            min_score = repr(state["s"])
+        members: list[tuple[bytes, float]] = db_instance.zrangebyscore(
+            cls._range_index_key_by_kwargs(field=field, table_kwargs=table_kwargs or {}), min_score, max_score,
+            start=state.get("k", 0), num=count, withscores=True,
+        )
+        if len(members) < count:
+            state["done"] = True
+        if members:
+            last_score: float = members[-1][1]
+            same_score_count: int = sum(1 for _, score in members if score == last_score)
+            state["k"] = state.get("k", 0) + same_score_count if state.get("s") == last_score else same_score_count
+            state["s"] = last_score
+        return [
+            member.decode() for member, _ in members
+                if not patterns or any(fnmatchcase(member.decode(), pattern) for pattern in patterns)
+        ]
+
+    @classmethod
+    def _get_table_patterns(cls: Type[T], table_kwargs: dict, items: Optional[list[T]] = None) -> list[str]:
+        """ Паттерны префиксов записей (без имени поля) по параметрам Meta.table и объектам """
+        kwargs_list: list[dict] = [
+            object_kwargs | table_kwargs for object_kwargs in cls._make_kwargs_from_objects(objects=items)
+        ] if items else [table_kwargs]
+        return list(dict.fromkeys(
+            table_filter[:-len(KEYS_DELIMITER + "*")]
+                for kwargs in kwargs_list
+                    for table_filter in cls._get_filters_by_kwargs(kwargs=kwargs)
+        ))
+
+    @classmethod
+    def _objects_from_tables(
+        cls: Type[T],
+        db_instance: redis.Redis,
+        tables: list[bytes],
+        fields: list[str],
+        lazy: bool = False,
+    ) -> list[T]:
+        """ Получение объектов по префиксам записей одним MGET """
+        if not tables:
+            return []
+        field_keys: list[bytes] = [cls._field_key(field=field).encode() for field in fields]
+        keys: list[bytes] = [
+            table + KEYS_DELIMITER_BYTES + field_key
+                for table in tables
+                    for field_key in field_keys
+        ]
+        values: list[Optional[bytes]] = cast(list[Optional[bytes]], db_instance.mget(keys))
+        # Ответ MGET соответствует порядку ключей, поэтому ключи не разбираются
+        return cls._objects_from_records(records=cls._records_from_rows(
+            tables=tables,
+            field_keys=field_keys,
+            values=values,
+            row_size=len(field_keys),
+        ), lazy=lazy)
 
-        return result
+    @classmethod
+    def count(cls: Type[T], **kwargs) -> int:
+        """
+            Количество объектов по фильтру (без получения самих объектов), например:
+
+                StorageItem.count(subsystem_id=10, any_value__gt=5)
+        """
+        db_instance, kwargs = cls._get_read_client(kwargs=kwargs)
+        if not kwargs:
+            raise Exception(f"{cls.__name__}.count() has empty filter. OOM possible.")
+        table_kwargs, range_bounds, predicates = cls._prepare_filters(kwargs=kwargs)
+        if not predicates and range_bounds:
+            field, (min_score, max_score) = next(iter(range_bounds.items()))
+            index_key: str = cls._range_index_key_by_kwargs(field=field, table_kwargs=table_kwargs)
+            if not table_kwargs or (index_key != cls._range_index_key(field=field)
+                                    and set(table_kwargs) == set(cls._range_partition)):
+                # Подсчёт только по индексу диапазонов (или его разделу): O(log(N))
+                return db_instance.zcount(index_key, min_score, max_score)
+        groups: dict[str, list[float]] = cls._aggregate(db_instance=db_instance, kwargs=kwargs)
+        return sum(int(state[0]) for state in groups.values())
 
     @classmethod
-    def _objects_from_db_items(cls: Type[T], items: dict[bytes, bytes]) -> list[T]:
-        """ Формирование cls(RedisItem)-объектов из данных базы """
-        # Подготовка базовых данных для формирования объектов из ключей
-        #   (уникальные ключи, без имён полей)
-        tables: set[str] = {
-            str(key).rsplit(KEYS_DELIMITER, 1)[0]
-                for key in items.keys()
+    def exists(cls: Type[T], **kwargs) -> bool:
+        """
+            Наличие хотя бы одного объекта по фильтру (поиск прекращается на первом найденном)
+
+                StorageItem.exists(subsystem_id=10, tag_id=55)
+        """
+        db_instance, kwargs = cls._get_read_client(kwargs=kwargs)
+        if not kwargs:
+            raise Exception(f"{cls.__name__}.exists() has empty filter. OOM possible.")
+        return bool(cls._aggregate(db_instance=db_instance, kwargs=kwargs, limit=1))
+
+    @classmethod
+    def aggregate(
+        cls: Type[T],
+        field: str,
+        op: str,
+        group_by: Optional[str] = None,
+        **kwargs,
+    ) -> Union[int, float, None, dict[str, Union[int, float, None]]]:
+        """
+            Агрегация значений поля на стороне Redis (count, sum, min, max, avg), например:
+
+                StorageItem.aggregate("any_value", "avg", subsystem_id=10)
+                StorageItem.aggregate("any_value", "sum", group_by="subsystem_id", tag_id=55)
+
+            При group_by возвращается словарь {значение параметра Meta.table: результат}
+        """
+        db_instance, kwargs = cls._get_read_client(kwargs=kwargs)
+        if not kwargs:
+            raise Exception(f"{cls.__name__}.aggregate() has empty filter. OOM possible.")
+        if op not in AGGREGATE_OPERATIONS:
+            raise Exception(f"{cls.__name__}.aggregate() unknown operation {op}...")
+        if field not in cls.__annotations__:
+            raise Exception(f"{cls.__name__}.aggregate() unknown field {field}...")
+        if group_by is not None and group_by not in cls._table_keys:
+            raise Exception(f"{cls.__name__}.aggregate() unknown group_by key {group_by}...")
+        groups: dict[str, list[float]] = cls._aggregate(
+            db_instance=db_instance,
+            kwargs=kwargs,
+            field=field,
+            group_by=group_by,
+        )
+        results: dict[str, Union[int, float, None]] = {}
+        for group, (count, total, min_value, max_value) in groups.items():
+            if group_by in cls._packed_keys:
+                group = cls._unpack_value(packed=group)
+            results[group] = {
+                "count": int(count),
+                "sum": total,
+                "min": min_value,
+                "max": max_value,
+                "avg": total / count if count else None,
+            }[op]
+        if group_by is not None:
+            return results
+        return results.get("", {"count": 0, "sum": 0.}.get(op))
+
+    @classmethod
+    def _aggregate(
+        cls: Type[T],
+        db_instance: redis.Redis,
+        kwargs: dict,
+        field: Optional[str] = None,
+        group_by: Optional[str] = None,
+        limit: int = 0,
+    ) -> dict[str, list[float]]:
+        """
+            Выполнение AGGREGATE_SCRIPT для порций префиксов записей: {группа: [count, sum, min, max]}
+            - без field подсчитываются записи (по ключу первого поля модели)
+            - limit - обход прекращается после limit подходящих записей
+        """
+        table_kwargs, range_bounds, predicates = cls._prepare_filters(kwargs=kwargs)
+        query: dict = cls._make_script_query(
+            predicates=predicates,
+            fields=[field or next(iter(cls.__annotations__))],
+        )
+        aggregation: dict = {
+            "group_by": cls._table_keys[group_by] if group_by else -1,
+            "value": field is not None,
+        }
+        aggregate_script = db_instance.register_script(AGGREGATE_SCRIPT)
+        groups: dict[str, list[float]] = {}
+        matched_count: int = 0
+        for tables in cls._iterate_candidates(
+            db_instance=db_instance,
+            table_kwargs=table_kwargs,
+            range_bounds=range_bounds,
+        ):
+            rows: list[bytes] = aggregate_script(args=[json.dumps([query | {
+                "tables": tables,
+                "aggregate": aggregation | {"limit": limit - matched_count if limit else 0},
+            }]), KEYS_DELIMITER])[0]
+            # Объединение результатов порций
+            for row_start in range(0, len(rows), 5):
+                count, total, min_value, max_value = (float(value) for value in rows[row_start + 1:row_start + 5])
+                state: Optional[list[float]] = groups.get(rows[row_start].decode())
+                if state is None:
+                    groups[rows[row_start].decode()] = [count, total, min_value, max_value]
+                else:
+                    state[0] += count
+                    state[1] += total
+                    state[2] = min(state[2], min_value)
+                    state[3] = max(state[3], max_value)
+                matched_count += int(count)
+            if limit and matched_count >= limit:
+                break
+        return groups
+
+    @classmethod
+    def _split_kwargs(cls: Type[T], kwargs: dict) -> tuple[dict, dict, list[tuple]]:
+        """
+            Разделение аргументов фильтра на:
+                - параметры Meta.table: subsystem_id=3, tag_id__in=[1, 2]
+                - условия на поля из Meta.range_index: date_time__gte=100
+                - условия на значения полей: any_value__gt=10 -> ("any_value", "gt", 10)
+        """
+        table_kwargs: dict = {}
+        range_kwargs: dict = {}
+        predicates: list[tuple] = []
+        for key, value in kwargs.items():
+            field, _, operator = key.rpartition("__")
+            if not field:
+                # Аргумент без оператора, например, any_value=10
+                field, operator = key, "eq"
+            if field in cls._table_keys or field not in cls.__annotations__:
+                table_kwargs[key] = value
+            elif field in cls._range_index and f"__{operator}" in RANGE_OPERATORS:
+                range_kwargs[key] = value
+            elif operator in FIELD_OPERATORS:
+                predicates.append((field, operator, value))
+            else:
+                table_kwargs[key] = value
+        return table_kwargs, range_kwargs, predicates
+
+    @staticmethod
+    def _get_range_bounds(range_kwargs: dict) -> dict[str, list[str]]:
+        """
+            Формирование границ ZRANGEBYSCORE для каждого поля, например:
+                {"date_time__gte": 10, "date_time__lt": 20} -> {"date_time": ["10", "(20"]}
+        """
+        bounds: dict[str, list[str]] = {}
+        for key, value in range_kwargs.items():
+            field, _, operator = key.rpartition("__")
+            field_bounds: list[str] = bounds.setdefault(field, ["-inf", "+inf"])
+            # Строгое неравенство в Redis обозначается префиксом "("
+            exclusive: str = "(" if operator in ("gt", "lt") else ""
+            position: int = 0 if RANGE_OPERATORS[f"__{operator}"] == "min" else 1
+            field_bounds[position] = f"{exclusive}{value}"
+        return bounds
+
+    @classmethod
+    def _range_index_key(cls: Type[T], field: str, partition: Optional[str] = None) -> str:
+        """
+            Имя ZSET-индекса поля, например, "__range__:subsystem.{subsystem_id}:date_time"
+            partition - раздел индекса (значения Meta.range_index_partition через разделитель),
+              например, "__range__:subsystem.{subsystem_id}:date_time:3"
+        """
+        index_key: str = ":".join([RANGE_INDEX_PREFIX, cls.Meta.table, field])
+        return index_key if partition is None else f"{index_key}:{partition}"
+
+    @classmethod
+    def _range_partition_of_table(cls: Type[T], table: str) -> str:
+        """ Раздел индекса диапазонов записи: сегменты префикса из Meta.range_index_partition """
+        segments: list[str] = table.split(KEYS_DELIMITER)
+        return KEYS_DELIMITER.join(segments[cls._table_keys[key]] for key in cls._range_partition)
+
+    @classmethod
+    def _range_index_key_by_kwargs(cls: Type[T], field: str, table_kwargs: dict) -> str:
+        """
+            Индекс диапазонов для фильтра: раздел, если все параметры Meta.range_index_partition
+              переданы одиночными значениями, иначе общий индекс модели
+        """
+        if not cls._range_partition or any(key not in table_kwargs for key in cls._range_partition):
+            return cls._range_index_key(field=field)
+        packed_kwargs: dict = cls._pack_table_kwargs(kwargs={key: table_kwargs[key] for key in cls._range_partition})
+        return cls._range_index_key(
+            field=field,
+            partition=KEYS_DELIMITER.join(str(packed_kwargs[key]) for key in cls._range_partition),
+        )
+
+    def _range_index_keys(self, field: str) -> list[str]:
+        """ Индексы диапазонов поля записи: общий индекс модели и раздел (Meta.range_index_partition) """
+        index_keys: list[str] = [self._range_index_key(field=field)]
+        if self._range_partition:
+            index_keys.append(self._range_index_key(
+                field=field,
+                partition=self._range_partition_of_table(table=self._table),
+            ))
+        return index_keys
+
+    @classmethod
+    def _stream_key(cls: Type[T]) -> str:
+        """ Имя потока изменений модели, например, "__stream__:subsystem.{subsystem_id}" """
+        return ":".join([STREAM_PREFIX, cls.Meta.table])
+
+    @classmethod
+    def _object_from_stream_fields(cls: Type[T], fields: dict[bytes, bytes]) -> T:
+        """ Формирование объекта из записи потока изменений """
+        table: bytes = fields.pop(STREAM_TABLE_FIELD.encode())
+        return cls._objects_from_records(records={table: fields})[0]
+
+    @classmethod
+    def subscribe(
+        cls: Type[T],
+        _batch_size: int = 100,
+        _block: int = 1_000,
+        _last_id: str = "$",
+        **kwargs,
+    ) -> Subscription[T]:
+        """
+            Подписка на записываемые объекты (требуется Meta.stream = True), например:
+
+                for item in ExampleItem.subscribe(subsystem_id=3, any_value__gt=10):
+                    ...
+
+            - фильтры как у RedisItem.filter, проверяются для каждой записи потока
+            - _batch_size - максимум записей потока за одно чтение
+            - _block - время ожидания новых записей одним XREAD (мс)
+            - _last_id - идентификатор записи потока, после которой начинается чтение
+              ("$" - только новые записи, "0" - с начала потока)
+        """
+        if not cls._stream_maxlen:
+            raise Exception(f"{cls.__name__} stream is not enabled (Meta.stream = True)...")
+        return Subscription(
+            model=cls,
+            kwargs=kwargs,
+            batch_size=_batch_size,
+            block=_block,
+            last_id=_last_id,
+        )
+
+    @classmethod
+    def _make_script_query(
+        cls: Type[T],
+        predicates: list[tuple],
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """
+            Формирование запроса для Lua-скрипта (формат описан в lua_scripts),
+              префиксы записей (query["tables"]) передаются для каждой порции
+        """
+        script_predicates: list[list] = []
+        for field, operator, value in predicates:
+            # Приведение значений условия к типу поля
+            field_type: type = cls.__annotations__[field]
+            is_number: bool = field_type in (int, float)
+            values: list = list(value) if operator == "in" else [value]
+            values = [
+                float(item) if is_number
+                    else item.decode() if isinstance(item, bytes)
+                        else str(item)
+                for item in values
+            ]
+            script_predicates.append([
+                cls._field_key(field=field),
+                operator,
+                values if operator == "in" else values[0],
+                is_number,
+            ])
+        return {
+            "tables": [],
+            "fields": [cls._field_key(field=field) for field in fields or cls.__annotations__],
+            "predicates": script_predicates,
+            "limit": limit or 0,
         }
+
+    @classmethod
+    def _make_fetch_query(cls: Type[T], kwargs: dict, items: Optional[list[T]] = None) -> dict:
+        """
+            Запрос для Lua-скрипта по аргументам фильтра (как у filter) с известными префиксами
+              записей: переданы все параметры Meta.table или _items (без SCAN), границы
+              индексов диапазонов проверяются как условия на значения полей
+        """
+        table_kwargs, range_kwargs, predicates = cls._split_kwargs(kwargs=kwargs)
+        tables: list[str] = cls._get_table_patterns(table_kwargs=table_kwargs, items=items)
+        if any(char in table for table in tables for char in "*?["):
+            raise Exception(f"{cls.__name__}.fetch_many() requires all Meta.table keys or _items...")
+        for key, value in range_kwargs.items():
+            field, _, operator = key.rpartition("__")
+            predicates.append((field, operator, value))
+        return cls._make_script_query(predicates=predicates) | {"tables": tables}
+
+    @classmethod
+    def _objects_from_script_rows(cls: Type[T], query: dict, rows: list, lazy: bool = False) -> list[T]:
+        """ Формирование объектов из плоского ответа скрипта [префикс, значения полей..., ...] """
+        row_size: int = len(query["fields"]) + 1
+        return cls._objects_from_records(records=cls._records_from_rows(
+            tables=rows[::row_size],
+            field_keys=[field.encode() for field in query["fields"]],
+            values=rows,
+            row_size=row_size,
+            offset=1,
+        ), lazy=lazy)
+
+    @staticmethod
+    def _records_from_rows(
+        tables: list[bytes],
+        field_keys: list[bytes],
+        values: list[Optional[bytes]],
+        row_size: int,
+        offset: int = 0,
+    ) -> dict[bytes, dict[bytes, bytes]]:
+        """
+            Группировка плоского списка значений по префиксам записей:
+                значения записи tables[index] - values[index * row_size + offset:][:len(field_keys)]
+        """
+        records: dict[bytes, dict[bytes, bytes]] = {}
+        for index, table in enumerate(tables):
+            row_start: int = index * row_size + offset
+            for position, field_key in enumerate(field_keys):
+                value: Optional[bytes] = values[row_start + position]
+                if value is not None:
+                    records.setdefault(table, {})[field_key] = value
+        return records
+
+    @classmethod
+    def _fetch_tables(cls: Type[T], db_instance: redis.Redis, query: dict, lazy: bool = False) -> list[T]:
+        """
+            Получение объектов из порции префиксов записей (query["tables"]) с проверкой
+              условий на значения полей на стороне Redis (Lua-скрипт возвращает только
+              подходящие записи, не более query["limit"])
+        """
+        fetch_script = db_instance.register_script(FETCH_SCRIPT)
+        rows_list: list[list] = fetch_script(args=[json.dumps([query]), KEYS_DELIMITER])
+        return cls._objects_from_script_rows(query=query, rows=rows_list[0], lazy=lazy)
+
+    @classmethod
+    def _objects_from_db_items(cls: Type[T], items: dict[bytes, bytes], lazy: bool = False) -> list[T]:
+        """
+            Формирование cls(RedisItem)-объектов из данных базы
+            lazy=True - значения полей сохраняются без приведения типа
+              (приводятся при первом обращении к атрибуту)
+        """
+        # Группировка полей по префиксам записей (порядок записей сохраняется),
+        #   ключи разбираются без промежуточных строк
+        records: dict[bytes, dict[bytes, bytes]] = {}
+        for key, value in items.items():
+            table, _, field_key = key.rpartition(KEYS_DELIMITER_BYTES)
+            records.setdefault(table, {})[field_key] = value
+        return cls._objects_from_records(records=records, lazy=lazy)
+
+    @classmethod
+    def _objects_from_records(cls: Type[T], records: dict[bytes, dict[bytes, bytes]], lazy: bool = False) -> list[T]:
+        """ Формирование объектов из записей {префикс записи: {имя поля в ключе: значение}} """
+        field_decoders: dict[bytes, tuple[str, Callable[[bytes], Any]]] = cls._field_decoders
+        values_cache: dict[str, str] = {}
         result_items: list[T] = []
-        for table in tables:
-            # Отбор полей с префиксом текущей table
-            fields_src: list[bytes] = list(
-                filter(lambda item: str(item).startswith(table), items)
-            )
+        for table, values in records.items():
             fields: dict[str, Any] = {}
-            for field in fields_src:
-                # Формирование атрибутов объекта из присутствующих полей
-                key: str = field.decode().rsplit(KEYS_DELIMITER, 1)[1]
+            for field_key, value in values.items():
+                field, decoder = field_decoders[field_key]
                 # Приведение типа к соответствующему полю cls
-                if cls.__annotations__[key] is str:
-                    fields[key] = items[field].decode()
-                else:
-                    fields[key] = cls.__annotations__[key](items[field])
-
+                fields[field] = value if lazy else decoder(value)
             # Формирование Meta из table класса и префикса полученных данных
-            table_args: dict = {}
-            src_values: list[str] = table.split('.')
-            for key, position in cls._table_keys.items():
-                table_args[key] = src_values[position]
-
-            result_items.append(cls(**(fields | table_args)))
+            table_args: dict = cls._table_args_from_table(table=table.decode(), values_cache=values_cache)
+            if lazy:
+                item: T = cls(**table_args)
+                item.__dict__["_raw_fields"] = fields
+                result_items.append(item)
+            else:
+                result_items.append(cls(**(fields | table_args)))
 
         return result_items
 
@@ -192,7 +1014,7 @@ class RedisItem(StorageItem):
     @classmethod
     def _get_filters_by_kwargs(cls: Type[T], kwargs: dict) -> list[str]:
         """ Подготовка списка паттернов поиска """
-        table: str = cls.Meta.table
+        table: str = cls._storage_table
         # Шаблон для поиска аргументов, которе не были переданы
         patterns: list[str] = re.findall(r'\{[^\}]*\}', table)
         str_filters: list[str] = []
@@ -205,19 +1027,79 @@ class RedisItem(StorageItem):
                 if not clean_key in prepared_kwargs:
                     table = table.replace(pattern, "*")
             # Заполнение паттерна поиска
-            str_filters.append(table.format(**prepared_kwargs) + ".*")
+            str_filters.append(table.format(**cls._pack_table_kwargs(kwargs=prepared_kwargs)) + ".*")
 
         return str_filters
 
     @property
     def mapping(self) -> Mapping[_Key, _Value]:
         """ Формирование ключей и значений для БД """
+        self._decode_raw_fields()
         return {
-            KEYS_DELIMITER.join([self._table, str(key)]): value
+            KEYS_DELIMITER.join([self._table, self._field_key(field=str(key))]): value
                 for key, value in self._params.items()
         }
 
+    @property
+    def range_mapping(self) -> Mapping[str, float]:
+        """ Формирование значений индексов диапазонов (имя ZSET: score) """
+        self._decode_raw_fields()
+        return {
+            index_key: self._params[field]
+                for field in self._range_index
+                    if self._params.get(field) is not None
+                        for index_key in self._range_index_keys(field=field)
+        }
+
+    def _prepare_pipe(self, pipe: redis.client.Pipeline) -> None:
+        """ Добавление команд записи объекта (значения и индексы) в pipeline """
+        pipe.mset(mapping=self.mapping)
+        for index_key, score in self.range_mapping.items():
+            pipe.zadd(index_key, {self._table: score})
+        if self._stream_maxlen:
+            pipe.xadd(
+                self._stream_key(),
+                {STREAM_TABLE_FIELD: self._table} | {
+                    self._field_key(field=field): value for field, value in self._params.items() if value is not None
+                },
+                maxlen=self._stream_maxlen,
+                approximate=True,
+            )
+
+    def _prepare_increment_pipe(self, pipe: redis.client.Pipeline, field: str, by: Union[int, float]) -> None:
+        """ Добавление команд изменения числового поля на by (значение и индекс) в pipeline """
+        field_type: Optional[type] = self.__class__.__annotations__.get(field)
+        key: str = KEYS_DELIMITER.join([self._table, self._field_key(field=field)])
+        if field_type is int:
+            if not isinstance(by, int):
+                raise Exception(f"{self.__class__.__name__}.{field} is int, increment must be int...")
+            pipe.incrby(key, by)
+        elif field_type is float:
+            pipe.incrbyfloat(key, by)
+        else:
+            raise Exception(f"{self.__class__.__name__}.{field} must be int or float field...")
+        if field in self._range_index:
+            for index_key in self._range_index_keys(field=field):
+                pipe.zincrby(index_key, by, self._table)
+
+    def _prepare_record_read(self, pipe: redis.client.Pipeline) -> None:
+        """ Чтение значений всех полей записи (для записи потока изменений после increment) """
+        pipe.mget([KEYS_DELIMITER.join([self._table, self._field_key(field=field)]) for field in self.__class__.__annotations__])
+
+    def _prepare_stream_increment(self, pipe: redis.client.Pipeline, values: list[Optional[bytes]]) -> None:
+        """ Запись потока изменений с полным состоянием записи (значения из _prepare_record_read) """
+        pipe.xadd(
+            self._stream_key(),
+            {STREAM_TABLE_FIELD: self._table} | {
+                self._field_key(field=field): value
+                    for field, value in zip(self.__class__.__annotations__, values) if value is not None
+            },
+            maxlen=self._stream_maxlen,
+            approximate=True,
+        )
+
     def __repr__(self) -> str:
+        self._decode_raw_fields()
         return (
             f"{self.__class__.__name__}({self._table=}, "
             f"{self._table_keys=}, {self._params=})"
@@ -225,6 +1107,8 @@ class RedisItem(StorageItem):
 
     def __eq__(self, other: Type[T]) -> bool:
         if isinstance(other, self.__class__):
+            self._decode_raw_fields()
+            other._decode_raw_fields()
             return self._params == other._params and self._table == other._table
 
         return False
@@ -241,6 +1125,10 @@ class RedisItem(StorageItem):
         """
         copied_instance: T = copy.copy(self)
         copied_instance._db_instance = db_instance
+        if "_raw_fields" in self.__dict__:
+            # Отложенные поля приводятся независимо в каждой копии
+            copied_instance.__dict__["_raw_fields"] = dict(self.__dict__["_raw_fields"])
+            copied_instance._params = dict(self._params)
         return copied_instance
 
     @classmethod
@@ -257,14 +1145,69 @@ class RedisItem(StorageItem):
         class CopiedClass(cls):  # type: ignore
             _db_instance = db_instance
         CopiedClass.__annotations__.update(cls.__annotations__)
+        # При создании копии аннотации ещё не перенесены, поэтому имена полей в ключах наследуются
+        CopiedClass._field_keys = cls._field_keys
+        CopiedClass._field_decoders = cls._field_decoders
         return cast(T, CopiedClass)
 
+    @classmethod
+    def increment(cls: Type[T], field: str, by: Union[int, float] = 1, **kwargs) -> Union[int, float]:
+        """
+            Атомарное изменение числового поля без чтения объекта, например:
+
+                StorageItem.increment("any_value", 5, subsystem_id=10, tag_id=55)
+
+            - передаются все параметры Meta.table, отсутствующее значение считается равным 0
+            - INCRBY для int-поля, INCRBYFLOAT для float-поля (и ZINCRBY для Meta.range_index)
+            - возвращается новое значение поля
+        """
+        if not cls._db_instance:
+            raise Exception("Redis database not connected...")
+        missing_keys: set[str] = set(cls._table_keys) - set(kwargs)
+        if missing_keys:
+            raise Exception(f"{cls.__name__}.increment() requires all Meta.table keys, missing {missing_keys}...")
+        item: T = cls(**{key: value for key, value in kwargs.items() if key in cls._table_keys})
+        if cls._write_buffer is not None and cls._write_buffer.client is cls._db_instance:
+            # Отложенная запись объекта не должна перезаписать изменённое значение: flush()
+            #   дожидается и записи, уже выполняемой фоновым потоком (объект может уже
+            #   отсутствовать в буфере, но ещё не быть записан)
+            cls._write_buffer.flush()
+        # Значение и индекс изменяются одной транзакцией, в ней же читается состояние записи для потока
+        pipe: redis.client.Pipeline = cls._db_instance.pipeline()
+        item._prepare_increment_pipe(pipe=pipe, field=field, by=by)
+        if cls._stream_maxlen:
+            item._prepare_record_read(pipe=pipe)
+        results: list = pipe.execute()
+        if cls._stream_maxlen:
+            stream_pipe: redis.client.Pipeline = cls._db_instance.pipeline(transaction=False)
+            item._prepare_stream_increment(pipe=stream_pipe, values=results[-1])
+            stream_pipe.execute()
+        return results[0]
+
+    @classmethod
+    def _on_error_actions(cls: Type[T], exception: Exception) -> None:
+        """
+            Действия, выполняющиеся в случае возникновения исключения
+                во время сохранения объекта
+        """
+        logging.exception(exception)
+
     def save(self) -> OperationResult:
         """ Одиночная вставка """
         if not self._db_instance:
             raise Exception("Redis database not connected...")
+        if self._write_buffer is not None and self._write_buffer.client is self._db_instance:
+            # Отложенная запись: объект будет записан фоновым потоком
+            self._write_buffer.put(item=self)
+            return OperationResult(status=OperationStatus.success)
         try:
-            self._db_instance.mset(mapping=self.mapping)
+            if self._range_index or self._stream_maxlen:
+                # Значения, индексы и запись потока записываются одной транзакцией
+                pipe: redis.client.Pipeline = self._db_instance.pipeline()
+                self._prepare_pipe(pipe=pipe)
+                pipe.execute()
+            else:
+                self._db_instance.mset(mapping=self.mapping)
             return OperationResult(status=OperationStatus.success)
         except Exception as exception:
             self._on_error_actions(exception=exception)
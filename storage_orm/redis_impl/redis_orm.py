@@ -1,7 +1,20 @@
+import json
 import redis
+import redis.sentinel
 import logging
+import itertools
+from typing import Any
+from typing import Type
+from typing import Iterable
+from typing import Optional
 
+from . import snapshot
 from .redis_item import RedisItem
+from .redis_item import KEYS_DELIMITER
+from .redis_item import SCAN_BATCH_SIZE
+from .lua_scripts import FETCH_SCRIPT
+from .read_router import ReadRouter
+from .write_behind import WriteBehindBuffer
 from .redis_item import T as SubclassItemType
 from ..operation_result import OperationResult
 from ..operation_result import OperationStatus
@@ -11,8 +24,9 @@ from ..storage_orm import StorageORM
 
 class RedisORM(StorageORM):
     """ Работа с БД Redis через объектное представление """
-    _pipe: redis.client.Pipeline
     _client: redis.Redis
+    _write_buffer: Optional[WriteBehindBuffer] = None
+    _read_router: Optional[ReadRouter] = None
 
     def __init__(
         self,
@@ -20,28 +34,87 @@ class RedisORM(StorageORM):
         host: str = None,
         port: int = 6379,
         db: int = 0,
+        write_behind: bool = False,
+        buffer_size: int = 10_000,
+        flush_size: int = 1_000,
+        flush_interval: float = 0.1,
+        replicas: Optional[list[redis.Redis]] = None,
+        read_policy: str = "round_robin",
+        sentinels: Optional[list[tuple[str, int]]] = None,
+        service_name: Optional[str] = None,
     ) -> None:
-        if client:
+        """
+            write_behind - режим отложенной записи: save() помещает объект в буфер
+              (не более buffer_size объектов), который записывается фоновым потоком
+              пакетами по flush_size объектов или раз в flush_interval секунд
+            replicas - подключения к репликам: чтения (filter/get/count/aggregate/paginate)
+              распределяются между ними по read_policy ("round_robin" или "random"),
+              запись выполняется через client; _consistent=True в фильтре - чтение с client
+            sentinels, service_name - подключение через Redis Sentinel: запись в master,
+              чтение с реплик сервиса
+        """
+        if sentinels:
+            if not service_name:
+                raise Exception("StorageORM-init with sentinels must contains service_name value...")
+            sentinel: redis.sentinel.Sentinel = redis.sentinel.Sentinel(sentinels)
+            self._client = sentinel.master_for(service_name, db=db)
+            # Пул подключений slave_for сам распределяет подключения между репликами
+            replicas = [sentinel.slave_for(service_name, db=db)]
+        elif client:
             self._client = client
         elif host:
             self._client = redis.Redis(host=host, port=port, db=db)
         else:
             raise Exception(f"StorageORM-init must contains redis_client or host values...")
 
-        self._pipe = self._client.pipeline()
         if not RedisItem._db_instance:
             RedisItem._set_global_instance(db_instance=self._client)
+        if replicas:
+            self._read_router = ReadRouter(primary=self._client, replicas=replicas, read_policy=read_policy)
+            if RedisItem._db_instance is self._client:
+                RedisItem._set_global_read_router(read_router=self._read_router)
+        if write_behind:
+            self._write_buffer = WriteBehindBuffer(
+                client=self._client,
+                max_size=buffer_size,
+                flush_size=flush_size,
+                flush_interval=flush_interval,
+            )
+            if RedisItem._db_instance is self._client:
+                RedisItem._set_global_write_buffer(write_buffer=self._write_buffer)
 
     def save(self, item: RedisItem) -> OperationResult:
         """ Одиночная вставка """
         return item.save()
 
-    def bulk_create(self, items: list[SubclassItemType]) -> OperationResult:
-        """ Групповая вставка """
+    def bulk_create(
+        self,
+        items: Iterable[SubclassItemType],
+        batch_size: int = 10_000,
+    ) -> OperationResult:
+        """
+            Групповая вставка
+            - items может быть любым итерируемым объектом (в т.ч. генератором), объекты
+              записываются пакетами по batch_size, поэтому в памяти одновременно
+              находится не более batch_size объектов
+            - для каждого пакета создаётся собственный pipeline, соединения берутся
+              из общего пула клиента, поэтому одновременные вызовы из разных потоков
+              не смешивают команды друг друга
+        """
+        if self._write_buffer is not None:
+            # Отложенные записи не должны перезаписать более новые данные
+            self._write_buffer.flush()
         try:
-            for redis_item in items:
-                self._pipe.mset(mapping=redis_item.mapping)
-            self._pipe.execute()
+            items_iterator: Iterable[SubclassItemType] = iter(items)
+            while True:
+                pipe: redis.client.Pipeline = self._client.pipeline()
+                batch_count: int = 0
+                for redis_item in itertools.islice(items_iterator, batch_size):
+                    redis_item._prepare_pipe(pipe=pipe)
+                    batch_count += 1
+                if not batch_count:
+                    break
+                pipe.execute()
             return OperationResult(status=OperationStatus.success)
         except Exception as exception:
             self._on_error_actions(exception=exception)
@@ -50,6 +123,171 @@ class RedisORM(StorageORM):
                 message=str(exception),
             )
 
+    def bulk_increment(
+        self,
+        items: Iterable[SubclassItemType],
+        field: str,
+        batch_size: int = 10_000,
+    ) -> OperationResult:
+        """
+            Групповое атомарное изменение числового поля без чтения объектов
+            - значение поля field каждого объекта - величина изменения, например:
+
+                orm.bulk_increment(items=[ExampleItem(subsystem_id=3, tag_id=15, any_value=5)], field="any_value")
+
+            - команды INCRBY/INCRBYFLOAT (и ZINCRBY для Meta.range_index) записываются
+              пакетами по batch_size через pipeline
+        """
+        if self._write_buffer is not None:
+            # Отложенные записи не должны перезаписать изменённые значения
+            self._write_buffer.flush()
+        try:
+            items_iterator: Iterable[SubclassItemType] = iter(items)
+            while True:
+                batch: list[SubclassItemType] = list(itertools.islice(items_iterator, batch_size))
+                if not batch:
+                    break
+                pipe: redis.client.Pipeline = self._client.pipeline()
+                # Позиции результатов MGET (состояние записи после изменения) объектов с потоком изменений
+                stream_items: list[tuple[SubclassItemType, int]] = []
+                for redis_item in batch:
+                    redis_item._prepare_increment_pipe(pipe=pipe, field=field, by=getattr(redis_item, field))
+                    if redis_item._stream_maxlen:
+                        stream_items.append((redis_item, len(pipe)))
+                        redis_item._prepare_record_read(pipe=pipe)
+                results: list = pipe.execute()
+                if stream_items:
+                    stream_pipe: redis.client.Pipeline = self._client.pipeline(transaction=False)
+                    for redis_item, position in stream_items:
+                        redis_item._prepare_stream_increment(pipe=stream_pipe, values=results[position])
+                    stream_pipe.execute()
+            return OperationResult(status=OperationStatus.success)
+        except Exception as exception:
+            self._on_error_actions(exception=exception)
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=str(exception),
+            )
+
+    def fetch_many(
+        self,
+        queries: list[tuple[Type[SubclassItemType], dict]],
+        consistent: bool = False,
+        lazy: bool = False,
+    ) -> list[list[SubclassItemType]]:
+        """
+            Выборка по нескольким моделям и фильтрам за одно обращение к БД, например:
+
+                examples, others = orm.fetch_many([
+                    (ExampleItem, {"subsystem_id": 3, "tag_id__in": [15, 16]}),
+                    (AnotherItem, {"subsystem_id__in": [3, 4], "any_value__gt": 10}),
+                ])
+
+            - фильтры такие же, как у filter, но префиксы записей должны быть известны
+              без SCAN: переданы все параметры Meta.table (допускается __in) или _items
+            - запросы выполняются вызовами Lua-скрипта не более чем по SCAN_BATCH_SIZE
+              префиксов (обычно одним вызовом) через подключение ORM (или реплику)
+            - возвращаются списки объектов в порядке запросов
+            - consistent=True - чтение с основного подключения, lazy - как _lazy у filter
+        """
+        if not queries:
+            return []
+        db_instance: redis.Redis = self._read_router.get_client(consistent=consistent) \
+            if self._read_router is not None else self._client
+        script_queries: list[dict] = []
+        for model, kwargs in queries:
+            filters: dict = dict(kwargs)
+            items: Optional[list[Any]] = filters.pop("_items", None)
+            if not filters and not items:
+                raise Exception(f"{model.__name__}.fetch_many() has empty filter. OOM possible.")
+            script_queries.append(model._make_fetch_query(kwargs=filters, items=items))
+        fetch_script = db_instance.register_script(FETCH_SCRIPT)
+        # Время блокировки Redis ограничено: вызов обрабатывает не более SCAN_BATCH_SIZE префиксов
+        rows_by_query: list[list] = [[] for _ in script_queries]
+        call_queries: list[tuple[int, dict]] = []
+        call_tables_count: int = 0
+        for query_index, query in enumerate(script_queries):
+            for chunk_start in range(0, len(query["tables"]), SCAN_BATCH_SIZE):
+                chunk: list[str] = query["tables"][chunk_start:chunk_start + SCAN_BATCH_SIZE]
+                if call_tables_count + len(chunk) > SCAN_BATCH_SIZE:
+                    self._fetch_rows(fetch_script=fetch_script, call_queries=call_queries, rows_by_query=rows_by_query)
+                    call_queries, call_tables_count = [], 0
+                call_queries.append((query_index, query | {"tables": chunk}))
+                call_tables_count += len(chunk)
+        if call_queries:
+            self._fetch_rows(fetch_script=fetch_script, call_queries=call_queries, rows_by_query=rows_by_query)
+        return [
+            model._objects_from_script_rows(query=query, rows=rows, lazy=lazy)
+                for (model, _), query, rows in zip(queries, script_queries, rows_by_query)
+        ]
+
+    @staticmethod
+    def _fetch_rows(fetch_script: Any, call_queries: list[tuple[int, dict]], rows_by_query: list[list]) -> None:
+        """ Вызов скрипта для порции запросов, строки ответа добавляются к результатам исходных запросов """
+        rows_list: list[list] = fetch_script(args=[
+            json.dumps([query for _, query in call_queries]),
+            KEYS_DELIMITER,
+        ])
+        for (query_index, _), rows in zip(call_queries, rows_list):
+            rows_by_query[query_index] += rows
+
+    def export_snapshot(self, model: Type[RedisItem], path: str, consistent: bool = True, **kwargs) -> OperationResult:
+        """
+            Запись объектов модели (все или по фильтру) в бинарный файл снимка, например:
+
+                orm.export_snapshot(ExampleItem, "example.snapshot", subsystem_id=3)
+
+            consistent=False - допускается чтение с реплики (снимок может не содержать последних записей)
+        """
+        if self._write_buffer is not None:
+            # Снимок должен содержать отложенные записи
+            self._write_buffer.flush()
+        try:
+            count: int = snapshot.export_snapshot(
+                model=model,
+                path=path,
+                db_instance=self._client,
+                consistent=consistent,
+                **kwargs,
+            )
+            return OperationResult(status=OperationStatus.success, message=f"items={count}")
+        except Exception as exception:
+            self._on_error_actions(exception=exception)
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=str(exception),
+            )
+
+    def import_snapshot(self, path: str, chunk_size: int = 10_000) -> OperationResult:
+        """
+            Запись объектов из файла снимка (значения и индексы диапазонов)
+            - файл отображается в память и читается последовательно, объекты
+              записываются порциями по chunk_size через pipeline
+        """
+        try:
+            count: int = snapshot.import_snapshot(path=path, db_instance=self._client, chunk_size=chunk_size)
+            return OperationResult(status=OperationStatus.success, message=f"items={count}")
+        except Exception as exception:
+            self._on_error_actions(exception=exception)
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=str(exception),
+            )
+
+    def flush(self) -> OperationResult:
+        """ Запись объектов из буфера отложенной записи """
+        if self._write_buffer is None:
+            return OperationResult(status=OperationStatus.success)
+        return self._write_buffer.flush()
+
+    def close(self) -> OperationResult:
+        """ Завершение работы: остановка фоновой записи и запись оставшихся объектов """
+        if self._write_buffer is None:
+            return OperationResult(status=OperationStatus.success)
+        if RedisItem._write_buffer is self._write_buffer:
+            RedisItem._set_global_write_buffer(write_buffer=None)
+        return self._write_buffer.close()
+
     def _on_error_actions(self, exception: Exception) -> None:
         """
             Действия, выполняющиеся в случае возникновения исключения
@@ -0,0 +1,196 @@
+"""
+    Снимок (snapshot) записей модели в бинарном файле для быстрого заполнения БД
+
+    Формат файла (целые числа - little-endian):
+        заголовок:
+            MAGIC (8 байт), версия (u16)
+            количество полей (u16), для каждого поля: длина (u16), имя поля в ключах БД
+            количество индексов диапазонов (u16), для каждого: длина (u16), имя ZSET,
+                номер поля (u16)
+            количество параметров раздела индекса (u16), для каждого: номер сегмента
+                префикса записи (u16) (Meta.range_index_partition)
+        записи до конца файла:
+            длина префикса записи (u32), префикс записи
+            для каждого поля: длина значения (i32, -1 - значения нет), значение
+
+    Значения сохраняются в том виде, в котором хранятся в БД (без приведения типов),
+    поэтому импорт не создаёт объекты моделей: файл отображается в память (mmap),
+    записи читаются последовательно и записываются порциями через pipeline (MSET и
+    ZADD индексов диапазонов). Потоки изменений (Meta.stream) при импорте не заполняются.
+"""
+from __future__ import annotations
+import mmap
+import redis
+import struct
+from typing import Any
+from typing import Type
+from typing import BinaryIO
+from typing import Iterator
+from typing import Optional
+
+from .redis_item import RedisItem
+from .redis_item import KEYS_DELIMITER
+
+MAGIC: bytes = b"SORMSNAP"
+VERSION: int = 2
+_U16: struct.Struct = struct.Struct("<H")
+_U32: struct.Struct = struct.Struct("<I")
+_I32: struct.Struct = struct.Struct("<i")
+
+
+def _write_string(file: BinaryIO, value: str) -> None:
+    encoded: bytes = value.encode()
+    file.write(_U16.pack(len(encoded)))
+    file.write(encoded)
+
+
+def _read_string(buffer: Any, offset: int) -> tuple[str, int]:
+    (length,) = _U16.unpack_from(buffer, offset)
+    offset += _U16.size
+    return buffer[offset:offset + length].decode(), offset + length
+
+
+def export_snapshot(
+    model: Type[RedisItem],
+    path: str,
+    db_instance: Optional[redis.Redis] = None,
+    consistent: bool = True,
+    **kwargs,
+) -> int:
+    """
+        Запись объектов модели (все или по фильтру как у RedisItem.filter) в файл снимка
+        consistent=True - чтение с основного подключения (реплика может отставать)
+        Возвращается количество записанных объектов
+    """
+    if db_instance is not None:
+        model = model.using(db_instance=db_instance)
+    fields: list[str] = list(model.__annotations__)
+    count: int = 0
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(_U16.pack(VERSION))
+        file.write(_U16.pack(len(fields)))
+        for field in fields:
+            _write_string(file=file, value=model._field_key(field=field))
+        file.write(_U16.pack(len(model._range_index)))
+        for field in model._range_index:
+            _write_string(file=file, value=model._range_index_key(field=field))
+            file.write(_U16.pack(fields.index(field)))
+        file.write(_U16.pack(len(model._range_partition)))
+        for key in model._range_partition:
+            file.write(_U16.pack(model._table_keys[key]))
+        # Значения полей получаются без приведения типа (в формате БД)
+        for item in model._iterate_objects(kwargs=kwargs | {"_consistent": consistent}, lazy=True):
+            table: bytes = item._table.encode()
+            file.write(_U32.pack(len(table)))
+            file.write(table)
+            raw_fields: dict[str, bytes] = item.__dict__.get("_raw_fields", {})
+            for field in fields:
+                value: Optional[bytes] = raw_fields.get(field)
+                if value is None:
+                    file.write(_I32.pack(-1))
+                else:
+                    file.write(_I32.pack(len(value)))
+                    file.write(value)
+            count += 1
+    return count
+
+
+def _read_records(
+    buffer: Any,
+    offset: int,
+    fields_count: int,
+) -> Iterator[tuple[bytes, list[Optional[bytes]]]]:
+    """ Последовательное чтение записей снимка: (префикс записи, значения полей) """
+    size: int = len(buffer)
+    while offset < size:
+        (table_length,) = _U32.unpack_from(buffer, offset)
+        offset += _U32.size
+        table: bytes = buffer[offset:offset + table_length]
+        offset += table_length
+        values: list[Optional[bytes]] = []
+        for _ in range(fields_count):
+            (value_length,) = _I32.unpack_from(buffer, offset)
+            offset += _I32.size
+            if value_length < 0:
+                values.append(None)
+                continue
+            values.append(buffer[offset:offset + value_length])
+            offset += value_length
+        yield table, values
+
+
+def import_snapshot(path: str, db_instance: redis.Redis, chunk_size: int = 10_000) -> int:
+    """
+        Запись объектов из файла снимка порциями по chunk_size объектов через pipeline
+        Возвращается количество записанных объектов
+    """
+    count: int = 0
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise Exception(f"{path} is not a snapshot file...")
+        offset: int = len(MAGIC)
+        (version,) = _U16.unpack_from(buffer, offset)
+        if version != VERSION:
+            raise Exception(f"Unsupported snapshot version {version}...")
+        (fields_count,) = _U16.unpack_from(buffer, offset + _U16.size)
+        offset += _U16.size * 2
+        fields: list[bytes] = []
+        for _ in range(fields_count):
+            field, offset = _read_string(buffer=buffer, offset=offset)
+            fields.append(KEYS_DELIMITER.encode() + field.encode())
+        (indexes_count,) = _U16.unpack_from(buffer, offset)
+        offset += _U16.size
+        range_indexes: list[tuple[str, int]] = []
+        for _ in range(indexes_count):
+            index_key, offset = _read_string(buffer=buffer, offset=offset)
+            (position,) = _U16.unpack_from(buffer, offset)
+            offset += _U16.size
+            range_indexes.append((index_key, position))
+        (partition_count,) = _U16.unpack_from(buffer, offset)
+        offset += _U16.size
+        partition_segments: list[int] = [
+            _U16.unpack_from(buffer, offset + _U16.size * index)[0] for index in range(partition_count)
+        ]
+        offset += _U16.size * partition_count
+        delimiter: bytes = KEYS_DELIMITER.encode()
+
+        mapping: dict[bytes, bytes] = {}
+        scores: dict[str, dict[bytes, float]] = {}
+        chunk_count: int = 0
+        for table, values in _read_records(buffer=buffer, offset=offset, fields_count=fields_count):
+            for field, value in zip(fields, values):
+                if value is not None:
+                    mapping[table + field] = value
+            partition: str = ""
+            if partition_segments and range_indexes:
+                segments: list[bytes] = table.split(delimiter)
+                partition = delimiter.join(segments[segment] for segment in partition_segments).decode()
+            for index_key, position in range_indexes:
+                if values[position] is None:
+                    continue
+                scores.setdefault(index_key, {})[table] = float(values[position])
+                if partition_segments:
+                    scores.setdefault(f"{index_key}:{partition}", {})[table] = float(values[position])
+            chunk_count += 1
+            if chunk_count >= chunk_size:
+                _write_chunk(db_instance=db_instance, mapping=mapping, scores=scores)
+                count += chunk_count
+                chunk_count = 0
+                mapping = {}
+                scores = {}
+        if chunk_count:
+            _write_chunk(db_instance=db_instance, mapping=mapping, scores=scores)
+            count += chunk_count
+    return count
+
+
+def _write_chunk(db_instance: redis.Redis, mapping: dict[bytes, bytes], scores: dict[str, dict[bytes, float]]) -> None:
+    """ Запись порции значений и индексов диапазонов одним pipeline """
+    pipe: Any = db_instance.pipeline(transaction=False)
+    if mapping:
+        pipe.mset(mapping=mapping)
+    for index_key, members in scores.items():
+        if members:
+            pipe.zadd(index_key, members)
+    pipe.execute()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import redis
+import asyncio
+import logging
+import operator
+from time import sleep
+from fnmatch import fnmatchcase
+from typing import Any
+from typing import Type
+from typing import Generic
+from typing import TypeVar
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import AsyncIterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .redis_item import RedisItem
+
+T = TypeVar('T', bound='RedisItem')
+
+# Проверка условий на значения полей (аналог compare в lua_scripts)
+PREDICATE_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda value, expected: value in expected,
+}
+
+
+class Subscription(Generic[T]):
+    """
+        Подписка на изменения объектов модели (Redis Stream, Meta.stream = True)
+        - save()/bulk_create() добавляют записанные объекты в поток модели
+        - XREAD BLOCK ожидает новые записи на стороне Redis, без опроса БД
+        - объекты читаются пачками до batch_size записей
+        - при потере соединения чтение возобновляется с последней полученной
+          записи с увеличивающейся задержкой
+        - итерация - генератор объектов, async for - асинхронный итератор, например:
+
+            for item in ExampleItem.subscribe(subsystem_id=3):
+                ...
+            async for item in ExampleItem.subscribe(any_value__gt=10):
+                ...
+    """
+    model: Type[T]
+    batch_size: int
+    block: int
+    last_id: str
+    reconnect_delay: float
+    max_reconnect_delay: float
+    _patterns: list[str]
+    _predicates: list[tuple[str, str, Any]]
+    _closed: bool
+
+    def __init__(
+        self,
+        model: Type[T],
+        kwargs: dict,
+        batch_size: int = 100,
+        block: int = 1_000,
+        last_id: str = "$",
+        reconnect_delay: float = 0.1,
+        max_reconnect_delay: float = 5.,
+    ) -> None:
+        self.model = model
+        self.batch_size = batch_size
+        self.block = block
+        self.last_id = last_id
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._closed = False
+        table_kwargs, range_kwargs, predicates = model._split_kwargs(kwargs=kwargs)
+        # Без параметров Meta.table префиксы записей не проверяются
+        self._patterns = model._get_table_patterns(table_kwargs=table_kwargs) if table_kwargs else []
+        # Границы индексов диапазонов проверяются как условия на значения полей
+        for key, value in range_kwargs.items():
+            field, _, condition = key.rpartition("__")
+            predicates.append((field, condition, value))
+        self._predicates = [
+            (field, condition, self._cast_expected(field=field, expected=expected))
+                for field, condition, expected in predicates
+        ]
+
+    def _cast_expected(self, field: str, expected: Any) -> Any:
+        """ Приведение значения условия к типу поля модели """
+        field_type: type = self.model.__annotations__[field]
+        if isinstance(expected, (list, tuple, set)):
+            return [field_type(value) for value in expected]
+        return field_type(expected)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """ Остановка подписки (после завершения текущего ожидания XREAD) """
+        self._closed = True
+
+    def __enter__(self) -> Subscription[T]:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def batches(self) -> Iterator[list[T]]:
+        """ Генератор пачек объектов (пустые пачки не возвращаются) """
+        while not self._closed:
+            batch: list[T] = self._read_batch()
+            if batch:
+                yield batch
+
+    def __iter__(self) -> Iterator[T]:
+        for batch in self.batches():
+            yield from batch
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        # Блокирующее чтение выполняется в пуле потоков event loop
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while not self._closed:
+            for item in await loop.run_in_executor(None, self._read_batch):
+                yield item
+
+    def _read_batch(self) -> list[T]:
+        """ Чтение очередной пачки записей потока с повторными попытками при потере соединения """
+        delay: float = self.reconnect_delay
+        while not self._closed:
+            try:
+                return self._read_entries()
+            except (redis.ConnectionError, redis.TimeoutError) as exception:
+                logging.warning(f"{self.model.__name__} subscription: {exception}, retry in {delay}s...")
+                sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        return []
+
+    def _read_entries(self) -> list[T]:
+        db_instance: Optional[redis.Redis] = self.model._db_instance
+        if not db_instance:
+            raise Exception("Redis database not connected...")
+        stream_key: str = self.model._stream_key()
+        if self.last_id == "$":
+            # Фиксация позиции, чтобы не потерять записи при переподключении
+            last_entries: list = db_instance.xrevrange(stream_key, count=1)
+            self.last_id = last_entries[0][0].decode() if last_entries else "0-0"
+        response: list = db_instance.xread(
+            streams={stream_key: self.last_id},
+            count=self.batch_size,
+            block=self.block,
+        )
+        result_items: list[T] = []
+        for _, entries in response:
+            for entry_id, fields in entries:
+                self.last_id = entry_id.decode()
+                item: T = self.model._object_from_stream_fields(fields=fields)
+                if self._patterns and not any(fnmatchcase(item._table, pattern) for pattern in self._patterns):
+                    continue
+                if self._matches(item=item):
+                    result_items.append(item)
+        return result_items
+
+    def _matches(self, item: T) -> bool:
+        """ Проверка условий на значения полей объекта (отсутствующее значение не подходит, как в lua_scripts) """
+        for field, condition, expected in self._predicates:
+            value: Any = getattr(item, field, None)
+            if value is None or not PREDICATE_OPERATORS[condition](value, expected):
+                return False
+        return True
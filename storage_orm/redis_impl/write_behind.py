@@ -0,0 +1,221 @@
+from __future__ import annotations
+import redis
+import atexit
+import logging
+import threading
+from time import sleep
+from time import monotonic
+from typing import Any
+from typing import TYPE_CHECKING
+
+from ..operation_result import OperationResult
+from ..operation_result import OperationStatus
+
+if TYPE_CHECKING:
+    from .redis_item import RedisItem
+
+
+class WriteBehindBuffer:
+    """
+        Буфер отложенной записи (write-behind)
+        - save() помещает объект в буфер и сразу возвращает управление
+        - повторные записи одного и того же объекта (модель + префикс) объединяются,
+          в БД попадает последнее состояние
+        - фоновый поток записывает буфер пакетами через pipeline при достижении
+          flush_size объектов или по истечении flush_interval секунд
+        - при заполнении буфера (max_size объектов) save() ожидает освобождения места
+        - при ошибке подключения запись пакета повторяется retry_count раз с паузой
+          retry_backoff * 2 ** (номер попытки) секунд, незаписанные объекты
+          возвращаются в буфер (более новые состояния тех же объектов не заменяются),
+          flush()/close() возвращают ошибку, фоновая запись повторяется не раньше,
+          чем через flush_interval
+        - при иной ошибке пакет записывается по одному объекту, объекты, запись которых
+          невозможна (например, с незаполненным полем), отбрасываются и перечисляются
+          в результате flush()/close()
+    """
+    client: redis.Redis
+    max_size: int
+    flush_size: int
+    flush_interval: float
+    retry_count: int
+    retry_backoff: float
+    _pending: dict[tuple[type, str], RedisItem]
+    _lock: threading.Lock
+    _flush_lock: threading.Lock
+    _not_full: threading.Condition
+    _has_items: threading.Condition
+    _closed: bool
+    _thread: threading.Thread
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_size: int = 10_000,
+        flush_size: int = 1_000,
+        flush_interval: float = 0.1,
+        retry_count: int = 3,
+        retry_backoff: float = 0.05,
+    ) -> None:
+        if flush_size > max_size:
+            raise Exception("WriteBehindBuffer flush_size must be less or equal than max_size...")
+        self.client = client
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.retry_count = retry_count
+        self.retry_backoff = retry_backoff
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._has_items = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="storage-orm-write-behind", daemon=True)
+        self._thread.start()
+        # Запись оставшихся данных при завершении процесса
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: RedisItem) -> None:
+        """ Помещение объекта в буфер (ожидание, если буфер заполнен) """
+        key: tuple[type, str] = (item.__class__, item._table)
+        with self._lock:
+            if self._closed:
+                raise Exception("WriteBehindBuffer closed...")
+            while len(self._pending) >= self.max_size and key not in self._pending:
+                self._has_items.notify()
+                self._not_full.wait()
+                if self._closed:
+                    raise Exception("WriteBehindBuffer closed...")
+            self._pending[key] = item
+            if len(self._pending) >= self.flush_size:
+                self._has_items.notify()
+
+    def flush(self) -> OperationResult:
+        """ Запись всех объектов, помещённых в буфер до вызова метода """
+        with self._flush_lock:
+            with self._lock:
+                items: list[RedisItem] = list(self._pending.values())
+                self._pending = {}
+                self._not_full.notify_all()
+            return self._write(items=items)
+
+    def close(self) -> OperationResult:
+        """ Остановка фонового потока и запись оставшихся объектов """
+        with self._lock:
+            if self._closed:
+                return OperationResult(status=OperationStatus.success)
+            self._closed = True
+            self._has_items.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        atexit.unregister(self.close)
+        return self.flush()
+
+    def _run(self) -> None:
+        """
+            Фоновая запись по достижению flush_size объектов или по истечении flush_interval
+              (после неудачной записи - только по истечении паузы)
+        """
+        deadline: float = monotonic() + self.flush_interval
+        failed: bool = False
+        while True:
+            with self._lock:
+                while not self._closed and (failed or len(self._pending) < self.flush_size):
+                    timeout: float = deadline - monotonic()
+                    if timeout <= 0:
+                        break
+                    self._has_items.wait(timeout=timeout)
+                if self._closed:
+                    return
+            failed = False
+            if self._pending:
+                failed = not self.flush().ok
+            delay: float = self.flush_interval
+            if failed:
+                delay = max(delay, self.retry_backoff * 2 ** self.retry_count)
+            deadline = monotonic() + delay
+
+    def _write(self, items: list[RedisItem]) -> OperationResult:
+        """
+            Запись объектов пакетами по flush_size через pipeline
+            - при ошибке подключения незаписанные объекты возвращаются в буфер
+            - при иной ошибке пакет записывается по одному объекту, объекты с ошибкой отбрасываются
+        """
+        dropped_items: list[tuple[RedisItem, Exception]] = []
+        for batch_start in range(0, len(items), self.flush_size):
+            batch: list[RedisItem] = items[batch_start:batch_start + self.flush_size]
+            try:
+                self._write_batch(items=batch)
+                continue
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as exception:
+                return self._write_failed(items=items[batch_start:], exception=exception, dropped_items=dropped_items)
+            except Exception as exception:
+                logging.warning(f"WriteBehindBuffer batch write failed ({exception}), writing objects one by one...")
+            for position, item in enumerate(batch):
+                try:
+                    self._write_batch(items=[item])
+                except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as exception:
+                    return self._write_failed(
+                        items=items[batch_start + position:],
+                        exception=exception,
+                        dropped_items=dropped_items,
+                    )
+                except Exception as exception:
+                    logging.exception(exception)
+                    dropped_items.append((item, exception))
+        if dropped_items:
+            return OperationResult(
+                status=OperationStatus.failed,
+                message=self._dropped_message(dropped_items=dropped_items),
+            )
+        return OperationResult(status=OperationStatus.success)
+
+    def _write_failed(
+        self,
+        items: list[RedisItem],
+        exception: Exception,
+        dropped_items: list[tuple[RedisItem, Exception]],
+    ) -> OperationResult:
+        """ Возврат незаписанных из-за ошибки подключения объектов в буфер """
+        logging.exception(exception)
+        self._requeue(items=items)
+        message: str = f"{exception}: {len(items)} objects returned to buffer..."
+        if dropped_items:
+            message = f"{message} {self._dropped_message(dropped_items=dropped_items)}"
+        return OperationResult(status=OperationStatus.failed, message=message)
+
+    @staticmethod
+    def _dropped_message(dropped_items: list[tuple[RedisItem, Exception]]) -> str:
+        """ Описание отброшенных объектов для OperationResult """
+        return f"{len(dropped_items)} objects dropped: " + ", ".join(
+            f"{item.__class__.__name__}({item._table}): {exception}" for item, exception in dropped_items
+        ) + "..."
+
+    def _write_batch(self, items: list[RedisItem]) -> None:
+        """ Запись пакета с повтором при ошибках подключения (пауза удваивается) """
+        for attempt in range(self.retry_count + 1):
+            pipe: Any = self.client.pipeline(transaction=False)
+            for item in items:
+                item._prepare_pipe(pipe=pipe)
+            try:
+                pipe.execute()
+                return
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as exception:
+                if attempt == self.retry_count:
+                    raise
+                logging.warning(f"WriteBehindBuffer write failed ({exception}), retry {attempt + 1}...")
+                sleep(self.retry_backoff * 2 ** attempt)
+
+    def _requeue(self, items: list[RedisItem]) -> None:
+        """ Возврат объектов в буфер без замены помещённых после flush() состояний """
+        with self._lock:
+            for item in items:
+                self._pending.setdefault((item.__class__, item._table), item)
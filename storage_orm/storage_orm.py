@@ -1,6 +1,7 @@
 from abc import ABCMeta
 from abc import abstractmethod
 from typing import Any
+from typing import Iterable
 
 from .storage_item import StorageItem
 from .operation_result import OperationResult
@@ -24,5 +25,5 @@ class StorageORM(metaclass=ABCMeta):
         raise NotImplementedError
 
     @abstractmethod
-    def bulk_create(self, items: list[StorageItem]) -> OperationResult:
+    def bulk_create(self, items: Iterable[StorageItem]) -> OperationResult:
         raise NotImplementedError
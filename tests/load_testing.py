@@ -1,7 +1,11 @@
+import threading
+import tracemalloc
 from time import monotonic
 
 from storage_orm import RedisORM
 from storage_orm import RedisItem
+from storage_orm import MemoryORM
+from storage_orm import MemoryItem
 from storage_orm import StorageORM
 
 COUNT: int = 100_000
@@ -23,11 +27,135 @@ total_time: float = monotonic() - start_time
 print(f"StorageORM (write) -> Objects count: {COUNT}, total time: {total_time}")
 # Load test (direct)
 start_time: float = monotonic()
-items: list[TestItem] = TestItem.filter(param1=1, param2=1)
+items: list[TestItem] = list(TestItem.filter(param1=1, param2=1))
 total_time: float = monotonic() - start_time
 print(f"StorageORM (load, direct) -> Objects count: {COUNT}, total time: {total_time}")
 # Load test (use parameter __in)
 start_time: float = monotonic()
-items: list[TestItem] = TestItem.filter(param1__in=[1,2,3,4,5,6,7], param2=1)
+items: list[TestItem] = list(TestItem.filter(param1__in=[1,2,3,4,5,6,7], param2=1))
 total_time: float = monotonic() - start_time
 print(f"StorageORM (load, use __in = [1-7]) -> Objects count: {COUNT}, total time: {total_time}")
+
+
+# Concurrent writers: throughput of bulk_create from several threads sharing one RedisORM
+class ConcurrentTestItem(RedisItem):
+    attr1: int
+
+    class Meta:
+        table = "writer.{writer}.item.{item}"
+
+
+def concurrent_write(threads_count: int, items_count: int) -> float:
+    def writer(writer_id: int) -> None:
+        redis_orm.bulk_create(
+            ConcurrentTestItem(attr1=i, writer=writer_id, item=i) for i in range(items_count // threads_count)
+        )
+
+    threads: list[threading.Thread] = [threading.Thread(target=writer, args=(i,)) for i in range(threads_count)]
+    start_time: float = monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return monotonic() - start_time
+
+
+for threads_count in (1, 2, 4, 8):
+    total_time = concurrent_write(threads_count=threads_count, items_count=COUNT)
+    print(
+        f"StorageORM (concurrent write, threads={threads_count}) -> Objects count: {COUNT}, "
+        f"total time: {total_time}, objects per second: {int(COUNT / total_time)}"
+    )
+
+
+# Memory test: full keys vs Meta.aliases + Meta.packed_keys
+class CompactTestItem(RedisItem):
+    attr1: int
+    attr2: str
+
+    class Meta:
+        table = "param1.{param1}.param2.{param2}"
+        aliases = {"param1": "p1", "param2": "p2", "attr1": "a1", "attr2": "a2"}
+        packed_keys = ("param1", "param2")
+
+
+def used_memory() -> int:
+    return redis_orm._client.info("memory")["used_memory"]
+
+
+for item_class in (TestItem, CompactTestItem):
+    redis_orm._client.flushdb()
+    memory_before: int = used_memory()
+    redis_orm.bulk_create(item_class(attr1=i, attr2=str(i), param1=i, param2=i%3) for i in range(COUNT))
+    print(f"StorageORM (memory, {item_class.__name__}) -> Objects count: {COUNT}, used memory: {used_memory() - memory_before}")
+
+
+# In-process backend (MemoryORM) with the same API, for comparison
+class MemoryTestItem(MemoryItem):
+    attr1: int
+    attr2: str
+
+    class Meta:
+        table = "param1.{param1}.param2.{param2}"
+
+
+start_time = monotonic()
+memory_orm: StorageORM = MemoryORM()
+memory_orm.bulk_create([MemoryTestItem(attr1=i, attr2=str(i), param1=i%5, param2=i%3) for i in range(COUNT)])
+total_time = monotonic() - start_time
+print(f"MemoryORM (write) -> Objects count: {COUNT}, total time: {total_time}")
+start_time = monotonic()
+memory_items: list[MemoryTestItem] = MemoryTestItem.filter(param1=1, param2=1)
+total_time = monotonic() - start_time
+print(f"MemoryORM (load, direct) -> Objects count: {COUNT}, total time: {total_time}")
+start_time = monotonic()
+memory_items = MemoryTestItem.filter(param1__in=[1,2,3,4,5,6,7], param2=1)
+total_time = monotonic() - start_time
+print(f"MemoryORM (load, use __in = [1-7]) -> Objects count: {COUNT}, total time: {total_time}")
+
+
+# Decoding test: allocations per loaded field while building objects from MGET replies
+# (the reply is prepared in advance, so only result assembly is measured)
+class DecodingTestItem(RedisItem):
+    attr1: int
+    attr2: str
+    attr3: float
+
+    class Meta:
+        table = "param1.{param1}.param2.{param2}"
+
+
+class PreparedReplyRedis:
+    values: dict[bytes, bytes]
+
+    def __init__(self, values: dict[bytes, bytes]) -> None:
+        self.values = values
+
+    def mget(self, keys: list[bytes]) -> list:
+        return [self.values.get(key) for key in keys]
+
+
+decoding_tables: list[bytes] = [f"param1.{i%5}.param2.{i}".encode() for i in range(COUNT)]
+decoding_redis: PreparedReplyRedis = PreparedReplyRedis(values={
+    table + f".{field}".encode(): str(value).encode()
+        for i, table in enumerate(decoding_tables)
+            for field, value in (("attr1", i), ("attr2", f"value{i}"), ("attr3", i / 3))
+})
+fields_count: int = len(decoding_redis.values)
+for lazy in (False, True):
+    tracemalloc.start()
+    start_time = monotonic()
+    decoded_items: list[DecodingTestItem] = DecodingTestItem._objects_from_tables(
+        db_instance=decoding_redis,
+        tables=decoding_tables,
+        fields=["attr1", "attr2", "attr3"],
+        lazy=lazy,
+    )
+    total_time = monotonic() - start_time
+    retained_memory, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"StorageORM (decoding, lazy={lazy}) -> Fields count: {fields_count}, total time: {total_time}, "
+        f"peak bytes per field: {peak_memory // fields_count}, retained bytes per field: {retained_memory // fields_count}"
+    )
+    del decoded_items
@@ -0,0 +1,86 @@
+import pytest
+from pytest import MonkeyPatch
+
+from storage_orm import MemoryItem
+from storage_orm import NotFoundException
+from storage_orm import MoreThanOneFoundException
+from storage_orm.memory_impl import MemoryStorage
+
+
+class ExampleItem(MemoryItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+
+
+@pytest.fixture
+def storage(monkeypatch: MonkeyPatch) -> MemoryStorage:
+    """ Глобальное хранилище с тестовыми объектами """
+    memory_storage: MemoryStorage = MemoryStorage()
+    monkeypatch.setattr(MemoryItem, "_db_instance", memory_storage)
+    for subsystem_id in range(3):
+        for tag_id in range(4):
+            ExampleItem(
+                subsystem_id=subsystem_id,
+                tag_id=tag_id,
+                date_time=tag_id,
+                any_value=subsystem_id * 10. + tag_id,
+            ).save()
+    return memory_storage
+
+
+def test_save_and_get(storage: MemoryStorage) -> None:
+    item: ExampleItem = ExampleItem.get(subsystem_id=1, tag_id=2)
+    assert item.mapping == {"subsystem.1.tag.2.date_time": 2, "subsystem.1.tag.2.any_value": 12.}
+    # Значения параметров Meta.table - строки, как у RedisItem
+    assert (item.subsystem_id, item.tag_id) == ("1", "2")
+    assert len(storage) == 12
+
+
+def test_save_updates_fields(storage: MemoryStorage) -> None:
+    """ Повторная запись обновляет только переданные поля """
+    ExampleItem(subsystem_id=1, tag_id=2, any_value=5.).save()
+    assert ExampleItem.get(subsystem_id=1, tag_id=2).mapping == {
+        "subsystem.1.tag.2.date_time": 2,
+        "subsystem.1.tag.2.any_value": 5.,
+    }
+    assert len(storage) == 12
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_tables", [
+        ({"subsystem_id": 2}, [f"subsystem.2.tag.{tag_id}" for tag_id in range(4)]),
+        ({"subsystem_id__in": [0, 2], "tag_id": 3}, ["subsystem.0.tag.3", "subsystem.2.tag.3"]),
+        ({"tag_id": 1, "any_value__gte": 11}, ["subsystem.1.tag.1", "subsystem.2.tag.1"]),
+        ({"date_time__in": [0], "subsystem_id": 1}, ["subsystem.1.tag.0"]),
+        ({"subsystem_id": 7}, []),
+    ],
+)
+def test_filter(storage: MemoryStorage, kwargs: dict, expected_tables: list[str]) -> None:
+    assert [item._table for item in ExampleItem.filter(**kwargs)] == expected_tables
+
+
+def test_filter_by_items(storage: MemoryStorage) -> None:
+    items: list[ExampleItem] = ExampleItem.filter(_items=[ExampleItem(subsystem_id=1, tag_id=1)], any_value__gt=0)
+    assert [item._table for item in items] == ["subsystem.1.tag.1"]
+
+
+def test_filter_errors(storage: MemoryStorage) -> None:
+    with pytest.raises(Exception):
+        ExampleItem.filter()
+    with pytest.raises(Exception):
+        ExampleItem.filter(unknown_key=1)
+    with pytest.raises(NotFoundException):
+        ExampleItem.get(subsystem_id=7)
+    with pytest.raises(MoreThanOneFoundException):
+        ExampleItem.get(subsystem_id=1)
+
+
+def test_using(storage: MemoryStorage) -> None:
+    """ Операции через другое хранилище не затрагивают глобальное """
+    another_storage: MemoryStorage = MemoryStorage()
+    ExampleItem(subsystem_id=9, tag_id=9, date_time=1, any_value=1.).using(db_instance=another_storage).save()
+    assert len(ExampleItem.using(db_instance=another_storage).filter(subsystem_id=9)) == 1
+    assert ExampleItem.filter(subsystem_id=9) == []
@@ -0,0 +1,43 @@
+from pytest import MonkeyPatch
+
+from storage_orm import MemoryORM
+from storage_orm import MemoryItem
+from storage_orm.memory_impl import MemoryStorage
+
+
+class ExampleItem(MemoryItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+
+
+class AnotherItem(MemoryItem):
+    any_value: float
+
+    class Meta:
+        table = "another.{another_id}"
+
+
+def test_init_global_storage(monkeypatch: MonkeyPatch) -> None:
+    """ Первое хранилище становится глобальным (в том числе пустое) """
+    monkeypatch.setattr(MemoryItem, "_db_instance", None)
+    first_orm: MemoryORM = MemoryORM()
+    MemoryORM()
+    assert MemoryItem._db_instance is first_orm._client
+
+
+def test_bulk_create(monkeypatch: MonkeyPatch) -> None:
+    """ Групповая вставка объектов нескольких моделей пакетами из генератора """
+    storage: MemoryStorage = MemoryStorage()
+    monkeypatch.setattr(MemoryItem, "_db_instance", storage)
+    items = (
+        ExampleItem(subsystem_id=index % 2, tag_id=index, date_time=index, any_value=1.) if index % 3
+            else AnotherItem(another_id=index, any_value=2.)
+        for index in range(10)
+    )
+    assert MemoryORM(client=storage).bulk_create(items=items, batch_size=3).ok
+    assert len(storage) == 10
+    assert len(ExampleItem.filter(subsystem_id=1)) == 3
+    assert AnotherItem.get(another_id=9).any_value == 2.
@@ -1,21 +1,36 @@
 from __future__ import annotations
 import redis
+from fnmatch import fnmatchcase
 
 
 class MockedRedis(redis.Redis):
     calls_count: int
     execute_calls_count: int
+    zadd_calls_count: int
+    xadd_calls: list[tuple]
+    scan_keys: list[bytes] = []
     _pipe: MockedRedis
 
     def __init__(self, is_pipe: bool = False) -> None:
         self.calls_count = 0
         self.execute_calls_count = 0
+        self.zadd_calls_count = 0
+        self.xadd_calls = []
         if not is_pipe:
             self._pipe = self.__class__(is_pipe=True)
 
     def mset(self, **_) -> None:
         self.calls_count += 1
 
+    def zadd(self, *_, **__) -> None:
+        self.zadd_calls_count += 1
+
+    def xadd(self, *args, **kwargs) -> None:
+        self.xadd_calls.append((args, kwargs))
+
+    def scan(self, cursor: int = 0, match: str = "*", **_) -> tuple[int, list[bytes]]:
+        return 0, [key for key in self.scan_keys if fnmatchcase(key.decode(), match)]
+
     def execute(self, **_) -> None:
         self.execute_calls_count += 1
 
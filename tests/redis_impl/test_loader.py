@@ -0,0 +1,102 @@
+import json
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+from storage_orm import RedisORM
+from storage_orm import RedisItem
+from storage_orm.redis_impl.loader import load_file
+from storage_orm.redis_impl.loader import import_model
+from storage_orm.redis_impl.loader import _read_chunks
+from storage_orm.redis_impl.loader import _read_records
+from storage_orm.redis_impl.loader import _prepare_chunk
+
+from .mocked_redis import MockedRedis
+
+
+class LoadedItem(RedisItem):
+    date_time: int
+    any_value: float
+    name: str
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ("date_time",)
+
+
+@pytest.fixture
+def mocked_redis() -> MockedRedis:
+    return MockedRedis()
+
+
+@pytest.fixture(autouse=True)
+def isolated_global_instance(monkeypatch: MonkeyPatch) -> None:
+    """ Глобальное подключение, установленное RedisORM, не должно влиять на другие тесты """
+    monkeypatch.setattr(RedisItem, "_db_instance", None)
+
+
+def test_import_model() -> None:
+    """ Получение класса модели по пути module:ClassName """
+    assert import_model(model_path=f"{__name__}:LoadedItem") is LoadedItem
+    with pytest.raises(Exception) as exception:
+        import_model(model_path=__name__)
+
+    assert "module:ClassName" in str(exception.value)
+
+
+@pytest.mark.parametrize(
+    "file_format, records, header", [
+        ("csv", [["3", "15", "100", "1.5", "abc"]], ["subsystem_id", "tag_id", "date_time", "any_value", "name"]),
+        (
+            "ndjson",
+            [json.dumps({"subsystem_id": 3, "tag_id": 15, "date_time": "100", "any_value": 1.5, "name": "abc"})],
+            None,
+        ),
+    ],
+)
+def test_prepare_chunk(file_format: str, records: list, header: list[str]) -> None:
+    """ Разбор записей с приведением типов к полям модели и формированием команд записи """
+    commands: list[tuple] = _prepare_chunk(LoadedItem, file_format, records, header)
+    assert commands == [
+        ("mset", (), {"mapping": {
+            "subsystem.3.tag.15.date_time": 100,
+            "subsystem.3.tag.15.any_value": 1.5,
+            "subsystem.3.tag.15.name": "abc",
+        }}),
+        ("zadd", ("__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time", {"subsystem.3.tag.15": 100}), {}),
+    ]
+
+
+def test_load_file(tmp_path: Path, mocked_redis: MockedRedis) -> None:
+    """ Загрузка файла порциями: команды каждой порции записываются отдельным pipeline """
+    path: Path = tmp_path / "items.csv"
+    path.write_text("subsystem_id,tag_id,date_time,any_value,name\n" + "".join(
+        f"{index % 3},{index},{index},{index / 2},name_{index}\n" for index in range(25)
+    ))
+    result = load_file(orm=RedisORM(client=mocked_redis), model=LoadedItem, path=str(path), processes=2, chunk_size=10)
+    assert result.ok
+    assert result.message == "rows=25"
+    assert mocked_redis._pipe.calls_count == 25
+    assert mocked_redis._pipe.zadd_calls_count == 25
+    assert mocked_redis._pipe.execute_calls_count == 3
+
+
+def test_read_records_multiline_csv(tmp_path: Path) -> None:
+    """ Поле CSV с переводом строки на границе порции не разбивает запись, пустые строки не учитываются """
+    path: Path = tmp_path / "items.csv"
+    path.write_text('subsystem_id,tag_id,name\n1,1,"first\nline"\n\n1,2,"second\n\nline"\n1,3,third\n')
+    with open(path, encoding="utf-8", newline="") as file:
+        chunks: list[list] = list(_read_chunks(records=_read_records(file=file, file_format="csv"), chunk_size=2))
+
+    assert chunks == [
+        [["subsystem_id", "tag_id", "name"], ["1", "1", "first\nline"]],
+        [["1", "2", "second\n\nline"], ["1", "3", "third"]],
+    ]
+
+
+def test_load_file_unknown_format(tmp_path: Path, mocked_redis: MockedRedis) -> None:
+    """ Осмысленное исключение для неизвестного формата файла """
+    with pytest.raises(Exception) as exception:
+        load_file(orm=RedisORM(client=mocked_redis), model=LoadedItem, path=str(tmp_path / "items.xml"))
+
+    assert "Unknown file format" in str(exception.value)
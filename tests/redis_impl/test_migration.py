@@ -0,0 +1,90 @@
+import pytest
+
+from storage_orm import RedisItem
+from storage_orm.redis_impl.loader import _CommandsRecorder
+from storage_orm.redis_impl.migration import migrate_keys
+from storage_orm.redis_impl.migration import _migrate_item
+
+
+class SourceItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ("date_time",)
+
+
+class TargetItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ("date_time",)
+        aliases = {"date_time": "d"}
+        packed_keys = ("tag_id",)
+
+
+def test_migrate_item_commands() -> None:
+    """ Запись в новом формате, удаление неиспользуемых ключей и замена элемента индекса """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    _migrate_item(
+        pipe=recorder,
+        item=SourceItem(subsystem_id="3", tag_id="100", date_time=10, any_value=1.5),
+        target_class=TargetItem,
+    )
+    index_key: str = "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time"
+    assert recorder.commands[0] == ("mset", (), {"mapping": {
+        "subsystem.3.tag.1c.d": 10,
+        "subsystem.3.tag.1c.any_value": 1.5,
+    }})
+    assert recorder.commands[1] == ("zadd", (index_key, {"subsystem.3.tag.1c": 10}), {})
+    assert recorder.commands[2][0] == "delete"
+    assert set(recorder.commands[2][1]) == {"subsystem.3.tag.100.date_time", "subsystem.3.tag.100.any_value"}
+    assert recorder.commands[3] == ("zrem", (index_key, "subsystem.3.tag.100"), {})
+
+
+def test_migrate_item_keeps_shared_keys() -> None:
+    """ Ключи, совпадающие в обоих форматах, не удаляются """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    _migrate_item(
+        pipe=recorder,
+        item=SourceItem(subsystem_id="3", tag_id="0", date_time=10, any_value=1.5),
+        target_class=TargetItem,
+    )
+    assert [command[0] for command in recorder.commands] == ["mset", "zadd", "delete"]
+    assert recorder.commands[2][1] == ("subsystem.3.tag.0.date_time",)
+
+
+def test_migrate_keys_requires_same_fields() -> None:
+    class AnotherItem(RedisItem):
+        date_time: int
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+
+    with pytest.raises(Exception):
+        migrate_keys(source=SourceItem, target=AnotherItem)
+
+
+def test_migrate_item_partial_record() -> None:
+    """ Отсутствующие в записи поля не переносятся, запись в поток изменений не добавляется """
+    class StreamTargetItem(RedisItem):
+        date_time: int
+        any_value: float
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+            range_index = ("date_time",)
+            aliases = {"date_time": "d"}
+            packed_keys = ("tag_id",)
+            stream = True
+
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    source_item: SourceItem = SourceItem._objects_from_db_items(items={b"subsystem.3.tag.100.date_time": b"10"})[0]
+    _migrate_item(pipe=recorder, item=source_item, target_class=StreamTargetItem)
+
+    assert recorder.commands[0] == ("mset", (), {"mapping": {"subsystem.3.tag.1c.d": 10}})
+    assert recorder.commands[2] == ("delete", ("subsystem.3.tag.100.date_time",), {})
+    assert "xadd" not in [command[0] for command in recorder.commands]
@@ -0,0 +1,151 @@
+import pytest
+from typing import Iterator
+from typing import Optional
+
+from storage_orm import RedisItem
+from storage_orm.redis_impl.query_set import QuerySet
+
+
+class FakeModel:
+    """ Модель, отдающая объекты по одному с подсчётом обращений к БД """
+    __annotations__ = {"date_time": int, "any_value": float}
+    __name__ = "FakeModel"
+    fetch_calls: list[dict] = []
+    produced_count: int = 0
+
+    class Item:
+        def __init__(self, index: int) -> None:
+            self.index = index
+            self.date_time = index % 3
+            self.any_value = float(index)
+
+    @classmethod
+    def _iterate_objects(
+        cls,
+        kwargs: dict,
+        items: Optional[list] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        limit: Optional[int] = None,
+        lazy: bool = False,
+    ) -> Iterator[Item]:
+        cls.fetch_calls.append({"kwargs": kwargs, "fields": fields, "limit": limit, "lazy": lazy})
+        for index in range(10 if limit is None else min(limit, 10)):
+            cls.produced_count += 1
+            yield cls.Item(index=index)
+
+    @classmethod
+    def count(cls, **_) -> int:
+        return 10
+
+
+@pytest.fixture
+def fake_model() -> type[FakeModel]:
+    FakeModel.fetch_calls = []
+    FakeModel.produced_count = 0
+    return FakeModel
+
+
+def test_lazy_evaluation(fake_model: type[FakeModel]) -> None:
+    """ Запрос к БД выполняется только во время итерации """
+    query_set: QuerySet = QuerySet(model=fake_model, kwargs={"subsystem_id": 3})
+    query_set = query_set.filter(tag_id=15).only("any_value")
+    assert fake_model.fetch_calls == []
+    assert len(query_set) == 10
+    assert fake_model.fetch_calls == [{
+        "kwargs": {"subsystem_id": 3, "tag_id": 15},
+        "fields": ("any_value",),
+        "limit": None,
+        "lazy": False,
+    }]
+
+
+def test_result_cache(fake_model: type[FakeModel]) -> None:
+    """ Повторная итерация использует полученные ранее объекты """
+    query_set: QuerySet = QuerySet(model=fake_model, kwargs={"subsystem_id": 3})
+    assert [item.index for item in query_set] == list(range(10))
+    assert [item.index for item in query_set] == list(range(10))
+    assert len(fake_model.fetch_calls) == 1
+
+
+def test_first_stops_after_one(fake_model: type[FakeModel]) -> None:
+    """ first() ограничивает запрос одним объектом """
+    first_item = QuerySet(model=fake_model, kwargs={"subsystem_id": 3}).first()
+    assert first_item.index == 0
+    assert fake_model.fetch_calls[0]["limit"] == 1
+    assert fake_model.produced_count == 1
+
+
+@pytest.mark.parametrize(
+    "apply_slice, expected_indexes, expected_limit", [
+        (lambda query_set: query_set[2:5], [2, 3, 4], 5),
+        (lambda query_set: query_set.limit(4), [0, 1, 2, 3], 4),
+        (lambda query_set: query_set[1:][:2], [1, 2], 3),
+        (lambda query_set: query_set.limit(5)[3:8], [3, 4], 5),
+    ],
+)
+def test_slicing(fake_model: type[FakeModel], apply_slice, expected_indexes: list, expected_limit: int) -> None:
+    """ Срез передаёт ограничение в запрос и прекращает получение объектов """
+    query_set: QuerySet = apply_slice(QuerySet(model=fake_model, kwargs={"subsystem_id": 3}))
+    assert [item.index for item in query_set] == expected_indexes
+    assert fake_model.fetch_calls[0]["limit"] == expected_limit
+    assert fake_model.produced_count == expected_limit
+
+
+def test_index(fake_model: type[FakeModel]) -> None:
+    """ Получение объекта по индексу """
+    query_set: QuerySet = QuerySet(model=fake_model, kwargs={"subsystem_id": 3})
+    assert query_set[7].index == 7
+    with pytest.raises(IndexError):
+        query_set[10]
+
+
+def test_order_by(fake_model: type[FakeModel]) -> None:
+    """ Сортировка по нескольким полям (в т.ч. по убыванию) выполняется до среза """
+    query_set: QuerySet = QuerySet(model=fake_model, kwargs={"subsystem_id": 3})
+    ordered: list = list(query_set.order_by("date_time", "-any_value")[:4])
+    assert [item.index for item in ordered] == [9, 6, 3, 0]
+    assert fake_model.fetch_calls[0]["limit"] is None
+
+
+def test_count_without_fetch(fake_model: type[FakeModel]) -> None:
+    """ count() до выполнения запроса не получает объекты и учитывает срез """
+    query_set: QuerySet = QuerySet(model=fake_model, kwargs={"subsystem_id": 3})
+    assert query_set.count() == 10
+    assert query_set[8:20].count() == 2
+    assert fake_model.fetch_calls == []
+
+
+def test_empty_filter(fake_model: type[FakeModel]) -> None:
+    """ Выборка без фильтра и без ограничения недопустима (OOM), с ограничением - допустима """
+    with pytest.raises(Exception) as exception:
+        list(QuerySet(model=fake_model))
+
+    assert "empty filter" in str(exception.value)
+    assert len(QuerySet(model=fake_model).limit(3)) == 3
+
+
+def test_defer_decoding(fake_model: type[FakeModel]) -> None:
+    """ Признак отложенного приведения типов передаётся в запрос и сохраняется при цепочке вызовов """
+    list(QuerySet(model=fake_model, kwargs={"subsystem_id": 3}).defer_decoding().only("any_value"))
+    assert fake_model.fetch_calls[0]["lazy"] is True
+
+
+def test_only_unknown_field(fake_model: type[FakeModel]) -> None:
+    """ Осмысленное исключение для неизвестного поля """
+    with pytest.raises(Exception) as exception:
+        QuerySet(model=fake_model).only("unknown_field")
+
+    assert "unknown fields" in str(exception.value)
+
+
+def test_objects_descriptor() -> None:
+    """ Model.objects возвращает новую выборку модели """
+    class DescriptorItem(RedisItem):
+        any_value: float
+
+        class Meta:
+            table = "subsystem.{subsystem_id}"
+
+    assert isinstance(DescriptorItem.objects, QuerySet)
+    assert DescriptorItem.objects.model is DescriptorItem
+    assert DescriptorItem.objects is not DescriptorItem.objects
@@ -1,3 +1,4 @@
+import json
 import pytest
 import redis
 from pytest import MonkeyPatch
@@ -6,6 +7,8 @@ from typing import Union
 from storage_orm import RedisItem
 from storage_orm import MoreThanOneFoundException
 from storage_orm import NotFoundException
+from storage_orm.redis_impl.loader import _CommandsRecorder
+from storage_orm.redis_impl.redis_item import SCAN_BATCH_SIZE
 
 from .mocked_redis import MockedRedis
 
@@ -232,3 +235,595 @@ def test_get_multiple_items_found(monkeypatch: MonkeyPatch) -> None:
 def test_get_list_of_prepared_kwargs(input_kwargs: dict, expected_kwargs: dict) -> None:
     """ Формирование элементов для использования в паттерне поиска """
     assert RedisItem._get_list_of_prepared_kwargs(kwargs=input_kwargs) == expected_kwargs
+
+
+@pytest.fixture
+def range_item_class() -> type[RedisItem]:
+    """ Тестовый класс с индексом диапазонов """
+    class RangeItem(RedisItem):
+        date_time: int
+        any_value: float
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+            range_index = ("date_time",)
+
+    return RangeItem
+
+
+def test_split_kwargs(range_item_class: type[RedisItem]) -> None:
+    """ Разделение аргументов на параметры Meta.table, индексы диапазонов и условия на поля """
+    table_kwargs, range_kwargs, predicates = range_item_class._split_kwargs(kwargs={
+        "subsystem_id": 3,
+        "tag_id__in": [1, 2],
+        "date_time__gte": 10,
+        "date_time__lt": 20,
+        "any_value__gt": 1.5,
+        "any_value__in": [1, 2],
+        "date_time": 15,
+    })
+    assert table_kwargs == {"subsystem_id": 3, "tag_id__in": [1, 2]}
+    assert range_kwargs == {"date_time__gte": 10, "date_time__lt": 20}
+    assert predicates == [
+        ("any_value", "gt", 1.5),
+        ("any_value", "in", [1, 2]),
+        ("date_time", "eq", 15),
+    ]
+
+
+@pytest.mark.parametrize(
+    "range_kwargs, expected_bounds", [
+        ({"date_time__gte": 10}, {"date_time": ["10", "+inf"]}),
+        ({"date_time__gt": 10}, {"date_time": ["(10", "+inf"]}),
+        ({"date_time__lte": 20}, {"date_time": ["-inf", "20"]}),
+        ({"date_time__gte": 10, "date_time__lt": 20}, {"date_time": ["10", "(20"]}),
+    ],
+)
+def test_get_range_bounds(range_kwargs: dict, expected_bounds: dict) -> None:
+    """ Формирование границ ZRANGEBYSCORE """
+    assert RedisItem._get_range_bounds(range_kwargs=range_kwargs) == expected_bounds
+
+
+def test_range_mapping(range_item_class: type[RedisItem]) -> None:
+    """ Индексируемые поля формируют score в ZSET модели """
+    item: RedisItem = range_item_class(subsystem_id=3, tag_id=15, date_time=100, any_value=1.)
+    assert item.range_mapping == {
+        "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time": 100,
+    }
+
+
+def test_save_with_range_index(range_item_class: type[RedisItem], mocked_redis: MockedRedis) -> None:
+    """ Сохранение индексируемого объекта записывает значения и индекс одним pipeline """
+    item: RedisItem = range_item_class(subsystem_id=3, tag_id=15, date_time=100, any_value=1.)
+    item.using(db_instance=mocked_redis).save()
+    assert mocked_redis._pipe.calls_count == 1
+    assert mocked_redis._pipe.zadd_calls_count == 1
+    assert mocked_redis._pipe.execute_calls_count == 1
+
+
+def test_filter_by_range(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Выборка по диапазону: ZRANGEBYSCORE, отбор по Meta.table и MGET без сканирования ключей """
+    requested_keys: list[bytes] = []
+
+    def mget(keys: list[bytes]) -> list[bytes]:
+        requested_keys.extend(keys)
+        return [b"150" if key.endswith(b"date_time") else b"1.5" for key in keys]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            MockedRedis,
+            "zrangebyscore",
+            lambda *_, **__: [(b"subsystem.3.tag.15", 150.), (b"subsystem.4.tag.15", 160.)],
+            raising=False,
+        )
+        patch.setattr(MockedRedis, "mget", lambda _, keys: mget(keys), raising=False)
+        patch.setattr(MockedRedis, "keys", lambda *_, **__: pytest.fail("KEYS called"), raising=False)
+        patch.setattr(MockedRedis, "scan", lambda *_, **__: pytest.fail("SCAN called"))
+        items: list[RedisItem] = list(range_item_class.using(db_instance=MockedRedis()).filter(
+            subsystem_id=3,
+            date_time__gte=100,
+        ))
+
+    assert requested_keys == [b"subsystem.3.tag.15.date_time", b"subsystem.3.tag.15.any_value"]
+    expected_item: RedisItem = range_item_class(subsystem_id="3", tag_id="15", date_time=150, any_value=1.5)
+    assert [item.mapping for item in items] == [expected_item.mapping]
+
+
+@pytest.fixture
+def partitioned_item_class() -> type[RedisItem]:
+    """ Тестовый класс с разделами индекса диапазонов по subsystem_id """
+    class PartitionedItem(RedisItem):
+        date_time: int
+        any_value: float
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+            range_index = ("date_time",)
+            range_index_partition = ("subsystem_id",)
+
+    return PartitionedItem
+
+
+def test_range_mapping_partition(partitioned_item_class: type[RedisItem]) -> None:
+    """ Запись попадает в общий индекс модели и в раздел своего subsystem_id """
+    item: RedisItem = partitioned_item_class(subsystem_id=3, tag_id=15, date_time=100, any_value=1.)
+    assert item.range_mapping == {
+        "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time": 100,
+        "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time:3": 100,
+    }
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_key", [
+        ({"subsystem_id": 3, "date_time__gte": 100}, "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time:3"),
+        ({"subsystem_id__in": [3, 4], "date_time__gte": 100}, "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time"),
+        ({"tag_id": 15, "date_time__gte": 100}, "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time"),
+    ],
+)
+def test_filter_by_range_partition(
+    partitioned_item_class: type[RedisItem],
+    monkeypatch: MonkeyPatch,
+    kwargs: dict,
+    expected_key: str,
+) -> None:
+    """ Раздел индекса используется, если переданы все параметры Meta.range_index_partition """
+    requested_index_keys: list[str] = []
+
+    def zrangebyscore(_, key: str, *__, **___) -> list:
+        requested_index_keys.append(key)
+        return []
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "zrangebyscore", zrangebyscore, raising=False)
+        list(partitioned_item_class.using(db_instance=MockedRedis()).filter(**kwargs))
+
+    assert requested_index_keys == [expected_key]
+
+
+def test_count_by_range_partition(partitioned_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Подсчёт по разделу индекса выполняется через ZCOUNT """
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "zcount", lambda _, *args: args, raising=False)
+        result = partitioned_item_class.using(db_instance=MockedRedis()).count(subsystem_id=3, date_time__gte=10)
+
+    assert result == ("__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time:3", "10", "+inf")
+
+
+def test_range_index_partition_validation() -> None:
+    with pytest.raises(Exception):
+        class InvalidItem(RedisItem):
+            date_time: int
+
+            class Meta:
+                table = "subsystem.{subsystem_id}"
+                range_index = ("date_time",)
+                range_index_partition = ("tag_id",)
+
+
+def test_make_script_query(range_item_class: type[RedisItem]) -> None:
+    """ Формирование запроса Lua-скрипта с приведением значений условий к типу поля """
+    query: dict = range_item_class._make_script_query(
+        predicates=[("any_value", "gt", "10"), ("date_time", "in", [1, 2])],
+    )
+    assert query == {
+        "tables": [],
+        "fields": ["date_time", "any_value"],
+        "predicates": [["any_value", "gt", 10., True], ["date_time", "in", [1., 2.], True]],
+        "limit": 0,
+    }
+
+
+def test_filter_by_script(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Условия на значения полей проверяются Lua-скриптом, клиенту возвращаются только подходящие записи """
+    script_calls: list[dict] = []
+
+    def register_script(_, script: str):
+        def fetch_script(args: list) -> list:
+            script_calls.append({"script": script, "args": args})
+            return [[b"subsystem.3.tag.15", b"150", b"11.5"]]
+        return fetch_script
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "register_script", register_script, raising=False)
+        patch.setattr(MockedRedis, "scan_keys", [b"subsystem.3.tag.15.date_time", b"subsystem.4.tag.1.date_time"])
+        items: list[RedisItem] = list(range_item_class.using(db_instance=MockedRedis()).filter(
+            subsystem_id=3,
+            any_value__gt=10,
+        ))
+
+    assert len(script_calls) == 1
+    # Скрипт получает порцию префиксов записей из SCAN, без KEYS
+    assert json.loads(script_calls[0]["args"][0])[0]["tables"] == ["subsystem.3.tag.15"]
+    assert script_calls[0]["args"][1] == "."
+    expected_item: RedisItem = range_item_class(subsystem_id="3", tag_id="15", date_time=150, any_value=11.5)
+    assert [item.mapping for item in items] == [expected_item.mapping]
+
+
+def _mocked_aggregate_redis(patch: MonkeyPatch, script_rows: list, script_calls: list) -> MockedRedis:
+    """ Подключение, у которого Lua-скрипт возвращает подготовленные строки агрегации """
+    def register_script(_, script: str):
+        def aggregate_script(args: list) -> list:
+            script_calls.append(json.loads(args[0])[0])
+            return [script_rows]
+        return aggregate_script
+
+    patch.setattr(MockedRedis, "register_script", register_script, raising=False)
+    patch.setattr(MockedRedis, "scan_keys", [b"subsystem.3.tag.15.date_time", b"subsystem.4.tag.15.date_time"])
+    return MockedRedis()
+
+
+def test_count_by_range_index(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Подсчёт только по индексу диапазонов выполняется через ZCOUNT """
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "zcount", lambda _, *args: args, raising=False)
+        result = range_item_class.using(db_instance=MockedRedis()).count(date_time__gte=10)
+
+    assert result == ("__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time", "10", "+inf")
+
+
+def test_count_and_exists(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ count/exists возвращают скаляры, exists ограничивает поиск первой записью """
+    script_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        db_instance: MockedRedis = _mocked_aggregate_redis(patch, [b"", b"7", b"0", b"0", b"0"], script_calls)
+        assert range_item_class.using(db_instance=db_instance).count(subsystem_id=3) == 7
+        assert range_item_class.using(db_instance=db_instance).exists(subsystem_id=3) is True
+
+    assert script_calls[0]["tables"] == ["subsystem.3.tag.15"]
+    assert script_calls[0]["fields"] == ["date_time"]
+    assert script_calls[0]["aggregate"] == {"group_by": -1, "value": False, "limit": 0}
+    assert script_calls[1]["aggregate"] == {"group_by": -1, "value": False, "limit": 1}
+
+
+@pytest.mark.parametrize(
+    "op, expected_result", [
+        ("count", 2),
+        ("sum", 30.),
+        ("min", 10.),
+        ("max", 20.),
+        ("avg", 15.),
+    ],
+)
+def test_aggregate(
+    range_item_class: type[RedisItem],
+    monkeypatch: MonkeyPatch,
+    op: str,
+    expected_result: float,
+) -> None:
+    """ Результат агрегации вычисляется из состояния [count, sum, min, max], полученного от скрипта """
+    script_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        db_instance: MockedRedis = _mocked_aggregate_redis(patch, [b"", b"2", b"30", b"10", b"20"], script_calls)
+        result = range_item_class.using(db_instance=db_instance).aggregate("any_value", op, tag_id=15)
+
+    assert result == expected_result
+    assert script_calls[0]["tables"] == ["subsystem.3.tag.15", "subsystem.4.tag.15"]
+    assert script_calls[0]["fields"] == ["any_value"]
+
+
+def test_aggregate_group_by(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Группировка по параметру Meta.table передаёт в скрипт позицию сегмента префикса """
+    script_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        db_instance: MockedRedis = _mocked_aggregate_redis(
+            patch,
+            [b"3", b"1", b"5", b"5", b"5", b"4", b"2", b"3", b"1", b"2"],
+            script_calls,
+        )
+        result = range_item_class.using(db_instance=db_instance).aggregate(
+            "any_value", "sum", group_by="subsystem_id", tag_id=15,
+        )
+
+    assert result == {"3": 5., "4": 3.}
+    assert script_calls[0]["aggregate"]["group_by"] == 1
+
+
+@pytest.mark.parametrize(
+    "method, args", [
+        ("count", ()),
+        ("exists", ()),
+        ("aggregate", ("any_value", "sum")),
+    ],
+)
+def test_aggregate_empty_filter(range_item_class: type[RedisItem], method: str, args: tuple) -> None:
+    """ Подсчёт и агрегация без фильтра обходят все записи модели и не выполняются """
+    with pytest.raises(Exception, match="empty filter"):
+        getattr(range_item_class.using(db_instance=MockedRedis()), method)(*args, _consistent=True)
+
+
+def test_filter_exact_table_without_scan(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ При переданных всех параметрах Meta.table запись получается одним MGET, без сканирования """
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "scan", lambda *_, **__: pytest.fail("SCAN called"))
+        patch.setattr(MockedRedis, "mget", lambda _, keys: [b"1", b"2.5"], raising=False)
+        item: RedisItem = range_item_class.using(db_instance=MockedRedis()).get(subsystem_id=3, tag_id=15)
+
+    assert item.mapping == {"subsystem.3.tag.15.date_time": 1, "subsystem.3.tag.15.any_value": 2.5}
+
+
+def test_filter_scan_by_first_field(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Префиксы записей сканируются по ключу первого поля модели, повторы SCAN отбрасываются """
+    scan_calls: list[dict] = []
+
+    def scan(_, cursor: int, **kwargs) -> tuple[int, list[bytes]]:
+        scan_calls.append(kwargs)
+        if not cursor:
+            return 1, [b"subsystem.3.tag.1.date_time", b"subsystem.3.tag.2.date_time"]
+        return 0, [b"subsystem.3.tag.1.date_time"]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "scan", scan)
+        patch.setattr(MockedRedis, "mget", lambda _, keys: [b"1"] * len(keys), raising=False)
+        items: list[RedisItem] = list(range_item_class.using(db_instance=MockedRedis()).filter(subsystem_id=3))
+
+    assert scan_calls[0]["match"] == "subsystem.3.tag.*.date_time"
+    assert [item._table for item in items] == ["subsystem.3.tag.1", "subsystem.3.tag.2"]
+
+
+def test_filter_limit_batch(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """
+        Ограничение выборки передаётся в индекс диапазонов, MGET получает только недостающие записи,
+          COUNT у SCAN не уменьшается (иначе число обращений растёт с размером БД)
+    """
+    mget_calls: list[list] = []
+    zrange_calls: list[dict] = []
+    scan_counts: list[int] = []
+    mocked_scan = MockedRedis.scan
+
+    def scan(self, cursor: int = 0, match: str = "*", count: int = 0) -> tuple[int, list[bytes]]:
+        scan_counts.append(count)
+        return mocked_scan(self, cursor=cursor, match=match)
+
+    def zrangebyscore(_, *args, **kwargs) -> list[tuple[bytes, float]]:
+        zrange_calls.append(kwargs)
+        return [(b"subsystem.3.tag.%d" % tag_id, float(tag_id)) for tag_id in range(kwargs["num"])]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "scan_keys", [b"subsystem.3.tag.%d.date_time" % tag_id for tag_id in range(10)])
+        patch.setattr(MockedRedis, "zrangebyscore", zrangebyscore, raising=False)
+        patch.setattr(MockedRedis, "scan", scan)
+        patch.setattr(MockedRedis, "mget", lambda _, keys: mget_calls.append(keys) or [b"1"] * len(keys), raising=False)
+        db_instance: MockedRedis = MockedRedis()
+        first_item: RedisItem = range_item_class.using(db_instance=db_instance).filter(subsystem_id=3).first()
+        range_items: list[RedisItem] = list(
+            range_item_class.using(db_instance=db_instance).filter(date_time__gte=0)[:3]
+        )
+        with pytest.raises(MoreThanOneFoundException):
+            range_item_class.using(db_instance=db_instance).get(subsystem_id=3)
+
+    assert first_item._table == "subsystem.3.tag.0"
+    assert len(range_items) == 3
+    assert zrange_calls[0]["num"] == 3
+    assert scan_counts == [SCAN_BATCH_SIZE, SCAN_BATCH_SIZE]
+    assert [len(keys) for keys in mget_calls] == [2, 6, 4]
+
+
+def test_objects_from_db_items_lazy(test_input_dict: dict, test_item: RedisItem) -> None:
+    """ Отложенное приведение типов: значение приводится при первом обращении и кэшируется """
+    expected_prefix: str = _get_prefix(src_dict=test_input_dict)
+    test_data: dict[bytes, bytes] = {
+        f"{expected_prefix}.attr2".encode(): b"19",
+        f"{expected_prefix}.attr3".encode(): b"99.9",
+    }
+    lazy_item: RedisItem = test_item._objects_from_db_items(items=test_data, lazy=True)[0]
+    assert "attr2" not in lazy_item.__dict__
+    assert lazy_item.__dict__["_raw_fields"] == {"attr2": b"19", "attr3": b"99.9"}
+    # Приведение типа при обращении к атрибуту
+    assert lazy_item.attr2 == 19
+    assert lazy_item.__dict__["attr2"] == 19
+    assert lazy_item.__dict__["_raw_fields"] == {"attr3": b"99.9"}
+    # Неполученные поля по-прежнему отсутствуют
+    with pytest.raises(AttributeError):
+        lazy_item.attr1
+    # Операции с объектом целиком приводят все поля
+    assert lazy_item.mapping[f"{expected_prefix}.attr3"] == 99.9
+    assert lazy_item.__dict__["_raw_fields"] == {}
+
+
+def test_lazy_item_using_copy(test_input_dict: dict, test_item: RedisItem, mocked_redis: MockedRedis) -> None:
+    """ Копия объекта (using) приводит отложенные поля независимо от исходного объекта """
+    expected_prefix: str = _get_prefix(src_dict=test_input_dict)
+    lazy_item: RedisItem = test_item._objects_from_db_items(
+        items={f"{expected_prefix}.attr2".encode(): b"19"},
+        lazy=True,
+    )[0]
+    copied_item: RedisItem = lazy_item.using(db_instance=mocked_redis)
+    assert copied_item.attr2 == 19
+    assert lazy_item.__dict__["_raw_fields"] == {"attr2": b"19"}
+    assert lazy_item.attr2 == 19
+
+
+def test_paginate_by_scan(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Страницы по курсору SCAN: лишние префиксы порции переносятся в токен следующей страницы """
+    scan_pages: dict[int, tuple[int, list[bytes]]] = {
+        0: (7, [b"subsystem.3.tag.1.date_time", b"subsystem.3.tag.2.date_time", b"subsystem.3.tag.3.date_time"]),
+        7: (0, [b"subsystem.3.tag.4.date_time"]),
+    }
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "scan", lambda _, cursor, **__: scan_pages[cursor], raising=False)
+        patch.setattr(MockedRedis, "mget", lambda _, keys: [b"1"] * len(keys), raising=False)
+        item_class: type[RedisItem] = range_item_class.using(db_instance=MockedRedis())
+        pages: list[list[str]] = []
+        cursor = None
+        while True:
+            items, cursor = item_class.paginate(page_size=2, cursor=cursor, subsystem_id=3)
+            pages.append([item._table for item in items])
+            if cursor is None:
+                break
+
+    assert pages == [
+        ["subsystem.3.tag.1", "subsystem.3.tag.2"],
+        ["subsystem.3.tag.3", "subsystem.3.tag.4"],
+        [],
+    ]
+
+
+def test_paginate_by_range_index(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Страницы по индексу диапазонов: продолжение с последнего score с пропуском полученных записей """
+    members: list[tuple[bytes, float]] = [
+        (b"subsystem.3.tag.1", 10.), (b"subsystem.3.tag.2", 10.), (b"subsystem.3.tag.3", 10.), (b"subsystem.3.tag.4", 20.),
+    ]
+    zrange_calls: list[tuple] = []
+
+    def zrangebyscore(_, key: str, min_score: str, max_score: str, start: int, num: int, **__) -> list:
+        zrange_calls.append((min_score, start))
+        minimum: float = float(min_score.lstrip("("))
+        return [member for member in members if member[1] >= minimum][start:start + num]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "zrangebyscore", zrangebyscore, raising=False)
+        patch.setattr(MockedRedis, "mget", lambda _, keys: [b"1"] * len(keys), raising=False)
+        item_class: type[RedisItem] = range_item_class.using(db_instance=MockedRedis())
+        first_page, cursor = item_class.paginate(page_size=2, date_time__gte=5)
+        second_page, cursor = item_class.paginate(page_size=2, cursor=cursor, date_time__gte=5)
+        last_page, cursor = item_class.paginate(page_size=2, cursor=cursor, date_time__gte=5)
+
+    assert [item._table for item in first_page] == ["subsystem.3.tag.1", "subsystem.3.tag.2"]
+    assert [item._table for item in second_page] == ["subsystem.3.tag.3", "subsystem.3.tag.4"]
+    assert last_page == [] and cursor is None
+    assert zrange_calls == [("5", 0), ("10.0", 2), ("20.0", 1)]
+
+
+@pytest.fixture
+def compact_item_class() -> type[RedisItem]:
+    """ Тестовый класс с сокращёнными ключами """
+    class CompactItem(RedisItem):
+        date_time: int
+        any_value: float
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+            aliases = {"subsystem": "s", "tag": "t", "date_time": "d"}
+            packed_keys = ("tag_id",)
+
+    return CompactItem
+
+
+@pytest.mark.parametrize("value, packed", [(0, "0"), (61, "z"), (62, "10"), (3844, "100"), (-75, "-1D")])
+def test_pack_value(value: int, packed: str) -> None:
+    assert RedisItem._pack_value(value=value) == packed
+    assert RedisItem._unpack_value(packed=packed) == str(value)
+
+
+def test_compact_keys(compact_item_class: type[RedisItem]) -> None:
+    """ Ключи формируются с сокращёнными именами и упакованными параметрами """
+    item: RedisItem = compact_item_class(subsystem_id=3, tag_id=3844, date_time=1, any_value=2.5)
+    assert item.mapping == {"s.3.t.100.d": 1, "s.3.t.100.any_value": 2.5}
+    assert compact_item_class._get_table_patterns(table_kwargs={"tag_id__in": [61, 62]}) == ["s.*.t.z", "s.*.t.10"]
+
+
+def test_compact_keys_parsing(compact_item_class: type[RedisItem]) -> None:
+    """ Разбор ключей БД в объекты: исходные имена полей и значения параметров """
+    items: list[RedisItem] = compact_item_class._objects_from_db_items(items={
+        b"s.3.t.100.d": b"1",
+        b"s.3.t.100.any_value": b"2.5",
+    })
+    assert len(items) == 1
+    assert (items[0].date_time, items[0].any_value) == (1, 2.5)
+    assert compact_item_class._make_kwargs_from_objects(objects=items) == [{"subsystem_id": "3", "tag_id": "3844"}]
+    lazy_item: RedisItem = compact_item_class._objects_from_db_items(items={b"s.3.t.100.d": b"1"}, lazy=True)[0]
+    assert lazy_item.__dict__["_raw_fields"] == {"date_time": b"1"}
+    assert lazy_item.date_time == 1
+
+
+def test_compact_keys_script_query(compact_item_class: type[RedisItem]) -> None:
+    """ Lua-скрипт получает имена полей в формате ключей БД """
+    query: dict = compact_item_class._make_script_query(predicates=[("date_time", "gt", 10)])
+    assert (query["fields"], query["predicates"]) == (["d", "any_value"], [["d", "gt", 10., True]])
+
+
+def test_aliases_validation() -> None:
+    with pytest.raises(Exception):
+        class DuplicatedAliasItem(RedisItem):
+            date_time: int
+            any_value: float
+
+            class Meta:
+                table = "subsystem.{subsystem_id}"
+                aliases = {"date_time": "v", "any_value": "v"}
+
+    with pytest.raises(Exception):
+        class FieldNameAliasItem(RedisItem):
+            date_time: int
+            any_value: float
+
+            class Meta:
+                table = "subsystem.{subsystem_id}"
+                aliases = {"date_time": "any_value"}
+
+
+def test_prepare_increment_pipe(range_item_class: type[RedisItem]) -> None:
+    """ Команда изменения выбирается по типу поля, индекс диапазонов изменяется вместе со значением """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    item: RedisItem = range_item_class(subsystem_id=3, tag_id=15)
+    item._prepare_increment_pipe(pipe=recorder, field="date_time", by=5)
+    item._prepare_increment_pipe(pipe=recorder, field="any_value", by=0.5)
+    assert recorder.commands == [
+        ("incrby", ("subsystem.3.tag.15.date_time", 5), {}),
+        ("zincrby", ("__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time", 5, "subsystem.3.tag.15"), {}),
+        ("incrbyfloat", ("subsystem.3.tag.15.any_value", 0.5), {}),
+    ]
+    with pytest.raises(Exception):
+        item._prepare_increment_pipe(pipe=recorder, field="date_time", by=0.5)
+
+
+def test_increment(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Изменение выполняется одной транзакцией без чтения объекта, возвращается новое значение """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "pipeline", lambda *_, **__: recorder)
+        patch.setattr(_CommandsRecorder, "execute", lambda _: [7, 7.], raising=False)
+        patch.setattr(MockedRedis, "mget", lambda *_: pytest.fail("MGET called"), raising=False)
+        value: int = range_item_class.using(db_instance=MockedRedis()).increment(
+            "date_time", 2, subsystem_id=3, tag_id=15,
+        )
+        with pytest.raises(Exception):
+            range_item_class.using(db_instance=MockedRedis()).increment("date_time", 2, subsystem_id=3)
+
+    assert value == 7
+    assert [command[0] for command in recorder.commands] == ["incrby", "zincrby"]
+
+
+def test_increment_flushes_write_buffer(range_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Перед изменением всегда дожидается отложенная запись (объект мог быть уже извлечён из буфера) """
+    db_instance: MockedRedis = MockedRedis()
+    events: list[str] = []
+
+    class WriteBuffer:
+        client = db_instance
+
+        def flush(self) -> None:
+            events.append("flush")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(RedisItem, "_write_buffer", WriteBuffer())
+        patch.setattr(MockedRedis, "incrbyfloat", lambda *_: events.append("incrbyfloat"), raising=False)
+        patch.setattr(MockedRedis, "execute", lambda *_, **__: [1.5], raising=False)
+        range_item_class.using(db_instance=db_instance).increment("any_value", 1.5, subsystem_id=3, tag_id=15)
+
+    assert events == ["flush", "incrbyfloat"]
+
+
+def test_compact_keys_using(compact_item_class: type[RedisItem]) -> None:
+    """ Копия класса для другого подключения формирует ключи так же, как исходный класс """
+    copied_class: type[RedisItem] = compact_item_class.using(db_instance=MockedRedis())
+    item: RedisItem = copied_class(subsystem_id=3, tag_id=3844, date_time=1, any_value=2.5)
+    assert item.mapping == {"s.3.t.100.d": 1, "s.3.t.100.any_value": 2.5}
+    assert copied_class._objects_from_db_items(items={b"s.3.t.100.d": b"1"})[0].date_time == 1
+
+
+def test_objects_from_tables(compact_item_class: type[RedisItem], monkeypatch: MonkeyPatch) -> None:
+    """ Объекты собираются по порядку ответа MGET, одинаковые значения параметров - один объект строки """
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "mget", lambda _, keys: [b"1", b"2.5", None, b"0.5"], raising=False)
+        items: list[RedisItem] = compact_item_class._objects_from_tables(
+            db_instance=MockedRedis(),
+            tables=[b"s.31.t.100", b"s.31.t.z"],
+            fields=["date_time", "any_value"],
+        )
+
+    assert items == [
+        compact_item_class(subsystem_id="31", tag_id="3844", date_time=1, any_value=2.5),
+        compact_item_class(subsystem_id="31", tag_id="61", any_value=0.5),
+    ]
+    assert items[0].subsystem_id is items[1].subsystem_id
@@ -1,12 +1,26 @@
+import json
+import time
 import pytest
+import threading
+from pytest import MonkeyPatch
 
 from storage_orm import RedisORM
 from storage_orm import RedisItem
+from storage_orm.redis_impl.read_router import ReadRouter
 
 from .mocked_item import MockedItem
 from .mocked_redis import MockedRedis
 
 
+class ReplicatedItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ("date_time",)
+
+
 @pytest.fixture
 def mocked_redis() -> MockedRedis:
     return MockedRedis()
@@ -66,3 +80,210 @@ def test_noreinit_global_db_connection(mocked_redis: MockedRedis) -> None:
     # Создать новое и проверить, что сохранилось первое подключение
     RedisORM(client=mocked_redis)
     assert id(MockedItem._db_instance) != id(mocked_redis)
+
+
+class LatencyPipeline:
+    """ Pipeline с задержкой выполнения, имитирующей сетевой обмен """
+    latency: float = 0.05
+    commands: list
+
+    def __init__(self, executed: list) -> None:
+        self.commands = []
+        self._executed = executed
+
+    def mset(self, mapping: dict) -> None:
+        self.commands.append(mapping)
+
+    def execute(self) -> None:
+        time.sleep(self.latency)
+        self._executed.append(list(self.commands))
+
+
+class LatencyRedis(MockedRedis):
+    """ Клиент, создающий новый pipeline на каждый вызов (как redis.Redis) """
+    executed: list
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.executed = []
+
+    def pipeline(self, **_) -> LatencyPipeline:
+        return LatencyPipeline(executed=self.executed)
+
+
+class ConcurrentItem(RedisItem):
+    value: int
+
+    class Meta:
+        table = "writer.{writer_id}.item.{item_id}"
+
+
+@pytest.mark.parametrize("threads_count", [4, 8])
+def test_bulk_create_concurrent_writers(threads_count: int) -> None:
+    """
+        Одновременные вызовы bulk_create из разных потоков не смешивают
+            команды в одном pipeline (рост пропускной способности с количеством
+            потоков измеряется в tests/load_testing.py)
+    """
+    items_count: int = 50
+    client: LatencyRedis = LatencyRedis()
+    orm: RedisORM = RedisORM(client=client)
+
+    def writer(writer_id: int) -> None:
+        orm.bulk_create(items=[
+            ConcurrentItem(writer_id=writer_id, item_id=item_id, value=item_id)
+                for item_id in range(items_count)
+        ])
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=writer, args=(writer_id,)) for writer_id in range(threads_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Каждый pipeline содержит только команды своего потока
+    assert len(client.executed) == threads_count
+    for batch in client.executed:
+        assert len(batch) == items_count
+        assert len({next(iter(mapping)).split(".")[1] for mapping in batch}) == 1
+
+
+def test_bulk_create_from_generator(mocked_redis: MockedRedis) -> None:
+    """ Генератор объектов записывается пакетами по batch_size, каждый пакет - отдельный execute """
+    items_count: int = 25
+    items = (MockedItem() for _ in range(items_count))
+    RedisORM(client=mocked_redis).bulk_create(items=items, batch_size=10)
+    assert mocked_redis._pipe.calls_count == items_count
+    assert mocked_redis._pipe.execute_calls_count == 3
+
+
+def test_read_router_policies() -> None:
+    """ Чтения распределяются между репликами, consistent=True - основное подключение """
+    primary, first_replica, second_replica = MockedRedis(), MockedRedis(), MockedRedis()
+    router: ReadRouter = ReadRouter(primary=primary, replicas=[first_replica, second_replica])
+    assert [router.get_client() for _ in range(4)] == [first_replica, second_replica] * 2
+    assert router.get_client(consistent=True) is primary
+
+    random_router: ReadRouter = ReadRouter(primary=primary, replicas=[first_replica], read_policy="random")
+    assert random_router.get_client() is first_replica
+    with pytest.raises(Exception):
+        ReadRouter(primary=primary, replicas=[first_replica], read_policy="unknown")
+
+
+def test_filter_reads_from_replica(monkeypatch: MonkeyPatch) -> None:
+    """ filter/count выполняются на репликах, запись и _consistent=True - на основном подключении """
+    primary, replica = MockedRedis(), MockedRedis()
+    mget_clients: list[MockedRedis] = []
+
+    def mget(client: MockedRedis, keys: list[bytes]) -> list[bytes]:
+        mget_clients.append(client)
+        return [b"1"] * len(keys)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(RedisItem, "_db_instance", None)
+        patch.setattr(RedisItem, "_read_router", None)
+        patch.setattr(MockedRedis, "mget", mget, raising=False)
+        patch.setattr(MockedRedis, "zcount", lambda client, *_: 0 if client is primary else 1, raising=False)
+        RedisORM(client=primary, replicas=[replica])
+        ReplicatedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.).save()
+        ReplicatedItem.get(subsystem_id=1, tag_id=1)
+        ReplicatedItem.get(subsystem_id=1, tag_id=1, _consistent=True)
+        replica_count: int = ReplicatedItem.count(date_time__gte=0)
+        primary_count: int = ReplicatedItem.objects.filter(date_time__gte=0, _consistent=True).count()
+
+    assert primary._pipe.execute_calls_count == 1 and replica._pipe.execute_calls_count == 0
+    assert mget_clients == [replica, primary]
+    assert (replica_count, primary_count) == (1, 0)
+
+
+def test_bulk_increment(monkeypatch: MonkeyPatch) -> None:
+    """ Изменения всех объектов записываются пакетами через pipeline, значения полей - величины изменений """
+    mocked_redis: MockedRedis = MockedRedis()
+    increments: list[tuple] = []
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "incrbyfloat", lambda _, *args: increments.append(args), raising=False)
+        result = RedisORM(client=mocked_redis).bulk_increment(
+            items=(ReplicatedItem(subsystem_id=1, tag_id=tag_id, any_value=0.5) for tag_id in range(5)),
+            field="any_value",
+            batch_size=2,
+        )
+
+    assert result.ok
+    assert increments == [(f"subsystem.1.tag.{tag_id}.any_value", 0.5) for tag_id in range(5)]
+    assert mocked_redis._pipe.execute_calls_count == 3
+
+
+class DeviceItem(RedisItem):
+    name: str
+
+    class Meta:
+        table = "device.{subsystem_id}.{device_id}"
+
+
+def test_fetch_many(monkeypatch: MonkeyPatch) -> None:
+    """ Запросы нескольких моделей выполняются одним вызовом скрипта, результаты - по запросам """
+    script_calls: list[list[dict]] = []
+
+    def register_script(_, script: str):
+        def fetch_script(args: list) -> list:
+            script_calls.append(json.loads(args[0]))
+            return [[b"subsystem.3.tag.15", b"150", b"1.5"], [b"device.3.7", b"pump"]]
+        return fetch_script
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "register_script", register_script, raising=False)
+        tags, devices = RedisORM(client=MockedRedis()).fetch_many([
+            (ReplicatedItem, {"subsystem_id": 3, "tag_id__in": [15, 16]}),
+            (DeviceItem, {"subsystem_id": 3, "device_id__in": [7, 8], "name__in": ["pump"]}),
+        ])
+
+    assert len(script_calls) == 1
+    assert script_calls[0][0]["tables"] == ["subsystem.3.tag.15", "subsystem.3.tag.16"]
+    assert script_calls[0][1]["tables"] == ["device.3.7", "device.3.8"]
+    assert tags == [ReplicatedItem(subsystem_id="3", tag_id="15", date_time=150, any_value=1.5)]
+    assert devices == [DeviceItem(subsystem_id="3", device_id="7", name="pump")]
+
+
+def test_fetch_many_empty_filter(mocked_redis: MockedRedis) -> None:
+    with pytest.raises(Exception):
+        RedisORM(client=mocked_redis).fetch_many([(DeviceItem, {})])
+
+
+def test_fetch_many_requires_known_tables(mocked_redis: MockedRedis) -> None:
+    """ Префиксы записей должны быть известны без SCAN """
+    with pytest.raises(Exception) as exception:
+        RedisORM(client=mocked_redis).fetch_many([(DeviceItem, {"subsystem_id": 3})])
+
+    assert "requires all Meta.table keys" in str(exception.value)
+
+
+def test_fetch_many_batches(monkeypatch: MonkeyPatch) -> None:
+    """ Вызов скрипта обрабатывает не более SCAN_BATCH_SIZE префиксов, строки объединяются по запросам """
+    script_calls: list[list[dict]] = []
+
+    def register_script(_, script: str):
+        def fetch_script(args: list) -> list:
+            queries: list[dict] = json.loads(args[0])
+            script_calls.append(queries)
+            return [
+                [value for table in query["tables"] for value in (table.encode(), b"pump")]
+                    for query in queries
+            ]
+        return fetch_script
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "register_script", register_script, raising=False)
+        patch.setattr("storage_orm.redis_impl.redis_orm.SCAN_BATCH_SIZE", 2)
+        first_devices, second_devices = RedisORM(client=MockedRedis()).fetch_many([
+            (DeviceItem, {"subsystem_id": 3, "device_id__in": [1, 2, 3]}),
+            (DeviceItem, {"subsystem_id": 4, "device_id": 1}),
+        ])
+
+    assert [[query["tables"] for query in queries] for queries in script_calls] == [
+        [["device.3.1", "device.3.2"]],
+        [["device.3.3"], ["device.4.1"]],
+    ]
+    assert [item._table for item in first_devices] == ["device.3.1", "device.3.2", "device.3.3"]
+    assert [item._table for item in second_devices] == ["device.4.1"]
@@ -0,0 +1,135 @@
+import pytest
+
+from storage_orm import RedisORM
+from storage_orm import RedisItem
+from storage_orm import OperationResult
+from storage_orm.redis_impl import snapshot
+from storage_orm.redis_impl.loader import _CommandsRecorder
+
+from .mocked_redis import MockedRedis
+
+
+class SnapshotItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        range_index = ("date_time",)
+        aliases = {"date_time": "d"}
+
+
+class RecordingRedis(MockedRedis):
+    """ Подключение, pipeline которого запоминает команды """
+    recorders: list[_CommandsRecorder]
+
+    def __init__(self, is_pipe: bool = False) -> None:
+        super().__init__(is_pipe=is_pipe)
+        self.recorders = []
+
+    def pipeline(self, **_) -> _CommandsRecorder:
+        recorder: _CommandsRecorder = _CommandsRecorder()
+        self.recorders.append(recorder)
+        return recorder
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch) -> str:
+    """ Файл снимка трёх объектов (у последнего нет значения any_value) """
+    db_items: dict[bytes, bytes] = {
+        b"subsystem.1.tag.1.d": b"10",
+        b"subsystem.1.tag.1.any_value": b"1.5",
+        b"subsystem.1.tag.2.d": b"20",
+        b"subsystem.1.tag.2.any_value": b"2.5",
+        b"subsystem.2.tag.3.d": b"30",
+    }
+    monkeypatch.setattr(
+        SnapshotItem,
+        "_iterate_objects",
+        classmethod(lambda cls, kwargs, lazy: iter(cls._objects_from_db_items(items=db_items, lazy=lazy))),
+    )
+    path: str = str(tmp_path / "items.snapshot")
+    assert snapshot.export_snapshot(model=SnapshotItem, path=path) == 3
+    return path
+
+
+def test_import_snapshot(snapshot_path: str) -> None:
+    """ Значения записываются в формате БД, индекс диапазонов заполняется """
+    db_instance: RecordingRedis = RecordingRedis()
+    assert snapshot.import_snapshot(path=snapshot_path, db_instance=db_instance) == 3
+    assert len(db_instance.recorders) == 1
+    assert db_instance.recorders[0].commands == [
+        ("mset", (), {"mapping": {
+            b"subsystem.1.tag.1.d": b"10",
+            b"subsystem.1.tag.1.any_value": b"1.5",
+            b"subsystem.1.tag.2.d": b"20",
+            b"subsystem.1.tag.2.any_value": b"2.5",
+            b"subsystem.2.tag.3.d": b"30",
+        }}),
+        ("zadd", ("__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time", {
+            b"subsystem.1.tag.1": 10.0,
+            b"subsystem.1.tag.2": 20.0,
+            b"subsystem.2.tag.3": 30.0,
+        }), {}),
+        ("execute", (), {}),
+    ]
+
+
+def test_import_snapshot_chunks(snapshot_path: str) -> None:
+    """ Объекты записываются порциями по chunk_size """
+    db_instance: RecordingRedis = RecordingRedis()
+    assert snapshot.import_snapshot(path=snapshot_path, db_instance=db_instance, chunk_size=2) == 3
+    assert len(db_instance.recorders) == 2
+    assert db_instance.recorders[1].commands[0] == ("mset", (), {"mapping": {b"subsystem.2.tag.3.d": b"30"}})
+
+
+def test_import_not_snapshot(tmp_path) -> None:
+    path = tmp_path / "items.csv"
+    path.write_text("subsystem_id,tag_id\n1,2\n")
+    result: OperationResult = RedisORM(client=RecordingRedis()).import_snapshot(path=str(path))
+    assert not result.ok
+
+
+def test_import_snapshot_partition(tmp_path, monkeypatch) -> None:
+    """ Разделы индекса диапазонов (Meta.range_index_partition) заполняются по префиксам записей """
+    class PartitionedSnapshotItem(RedisItem):
+        date_time: int
+
+        class Meta:
+            table = "subsystem.{subsystem_id}.tag.{tag_id}"
+            range_index = ("date_time",)
+            range_index_partition = ("subsystem_id",)
+
+    db_items: dict[bytes, bytes] = {b"subsystem.1.tag.1.date_time": b"10", b"subsystem.2.tag.3.date_time": b"30"}
+    monkeypatch.setattr(
+        PartitionedSnapshotItem,
+        "_iterate_objects",
+        classmethod(lambda cls, kwargs, lazy: iter(cls._objects_from_db_items(items=db_items, lazy=lazy))),
+    )
+    path: str = str(tmp_path / "items.snapshot")
+    snapshot.export_snapshot(model=PartitionedSnapshotItem, path=path)
+    db_instance: RecordingRedis = RecordingRedis()
+    snapshot.import_snapshot(path=path, db_instance=db_instance)
+
+    index_key: str = "__range__:subsystem.{subsystem_id}.tag.{tag_id}:date_time"
+    assert [command[1] for command in db_instance.recorders[0].commands if command[0] == "zadd"] == [
+        (index_key, {b"subsystem.1.tag.1": 10.0, b"subsystem.2.tag.3": 30.0}),
+        (f"{index_key}:1", {b"subsystem.1.tag.1": 10.0}),
+        (f"{index_key}:2", {b"subsystem.2.tag.3": 30.0}),
+    ]
+
+
+@pytest.mark.parametrize("consistent", [True, False])
+def test_export_snapshot_consistent(tmp_path, monkeypatch, consistent: bool) -> None:
+    """ Снимок по умолчанию читается с основного подключения, а не с реплики """
+    iterate_kwargs: list[dict] = []
+    monkeypatch.setattr(
+        SnapshotItem,
+        "_iterate_objects",
+        classmethod(lambda cls, kwargs, lazy: iterate_kwargs.append(kwargs) or iter([])),
+    )
+    result: OperationResult = RedisORM(client=RecordingRedis()).export_snapshot(
+        SnapshotItem, str(tmp_path / "items.snapshot"), consistent=consistent, subsystem_id=1,
+    )
+    assert result.ok
+    assert iterate_kwargs == [{"subsystem_id": 1, "_consistent": consistent}]
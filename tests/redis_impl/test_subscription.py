@@ -0,0 +1,158 @@
+import redis
+import pytest
+import asyncio
+from pytest import MonkeyPatch
+
+from storage_orm import RedisItem
+from storage_orm.redis_impl.loader import _CommandsRecorder
+from storage_orm.redis_impl.subscription import Subscription
+
+from .mocked_redis import MockedRedis
+
+
+class StreamItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+        stream = True
+        stream_maxlen = 1_000
+
+
+def _entry(entry_id: bytes, table: bytes, date_time: bytes, any_value: bytes) -> tuple:
+    return entry_id, {b"__table__": table, b"date_time": date_time, b"any_value": any_value}
+
+
+STREAM_ENTRIES: list[tuple] = [
+    _entry(b"1-0", b"subsystem.3.tag.1", b"10", b"1.5"),
+    _entry(b"2-0", b"subsystem.4.tag.1", b"20", b"11.5"),
+    _entry(b"3-0", b"subsystem.3.tag.2", b"30", b"12.5"),
+]
+
+
+def _mocked_stream_redis(patch: MonkeyPatch, xread_calls: list[dict], failures: int = 0) -> MockedRedis:
+    """ Подключение, у которого поток содержит STREAM_ENTRIES (первые failures чтений - ошибка соединения) """
+    def xread(_, streams: dict, count: int, block: int) -> list:
+        xread_calls.append(dict(streams))
+        if len(xread_calls) <= failures:
+            raise redis.ConnectionError("Connection refused")
+        last_id: bytes = list(streams.values())[0].encode()
+        entries: list[tuple] = [
+            (entry_id, dict(fields)) for entry_id, fields in STREAM_ENTRIES
+                if tuple(map(int, entry_id.split(b"-"))) > tuple(map(int, last_id.split(b"-")))
+        ][:count]
+        return [[list(streams)[0].encode(), entries]] if entries else []
+
+    patch.setattr(MockedRedis, "xread", xread, raising=False)
+    patch.setattr(MockedRedis, "xrevrange", lambda *_, **__: [STREAM_ENTRIES[0]], raising=False)
+    return MockedRedis()
+
+
+def test_save_appends_to_stream() -> None:
+    """ Запись объекта добавляет запись в поток модели в том же pipeline """
+    mocked_redis: MockedRedis = MockedRedis()
+    StreamItem(subsystem_id=3, tag_id=1, date_time=10, any_value=1.5).using(db_instance=mocked_redis).save()
+
+    assert mocked_redis._pipe.execute_calls_count == 1
+    assert mocked_redis._pipe.xadd_calls == [(
+        ("__stream__:subsystem.{subsystem_id}.tag.{tag_id}", {
+            "__table__": "subsystem.3.tag.1",
+            "date_time": 10,
+            "any_value": 1.5,
+        }),
+        {"maxlen": 1_000, "approximate": True},
+    )]
+
+
+def test_increment_appends_full_record_to_stream(monkeypatch: MonkeyPatch) -> None:
+    """ Запись потока после increment содержит состояние записи, прочитанное в той же транзакции """
+    recorder: _CommandsRecorder = _CommandsRecorder()
+    with monkeypatch.context() as patch:
+        patch.setattr(MockedRedis, "pipeline", lambda *_, **__: recorder)
+        patch.setattr(_CommandsRecorder, "execute", lambda _: [11, [b"11", b"1.5"]], raising=False)
+        value: int = StreamItem.using(db_instance=MockedRedis()).increment("date_time", 1, subsystem_id=3, tag_id=1)
+
+    assert value == 11
+    assert recorder.commands[:2] == [
+        ("incrby", ("subsystem.3.tag.1.date_time", 1), {}),
+        ("mget", (["subsystem.3.tag.1.date_time", "subsystem.3.tag.1.any_value"],), {}),
+    ]
+    assert recorder.commands[2] == (
+        "xadd",
+        ("__stream__:subsystem.{subsystem_id}.tag.{tag_id}", {
+            "__table__": "subsystem.3.tag.1",
+            "date_time": b"11",
+            "any_value": b"1.5",
+        }),
+        {"maxlen": 1_000, "approximate": True},
+    )
+
+
+def test_subscription_partial_entry(monkeypatch: MonkeyPatch) -> None:
+    """ Запись потока без поля условия не подходит под условие и не прерывает подписку """
+    xread_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            "tests.redis_impl.test_subscription.STREAM_ENTRIES",
+            [(b"1-0", {b"__table__": b"subsystem.3.tag.1", b"date_time": b"11"})] + STREAM_ENTRIES[1:],
+        )
+        item_class = StreamItem.using(db_instance=_mocked_stream_redis(patch=patch, xread_calls=xread_calls))
+        subscription: Subscription = item_class.subscribe(_last_id="0", any_value__gt=10)
+        batch: list[RedisItem] = next(subscription.batches())
+
+    assert [item._table for item in batch] == ["subsystem.4.tag.1", "subsystem.3.tag.2"]
+
+
+def test_subscribe_requires_stream() -> None:
+    with pytest.raises(Exception):
+        RedisItem.subscribe()
+
+
+def test_subscription_filters_and_batches(monkeypatch: MonkeyPatch) -> None:
+    """ Чтение с начала потока пачками, фильтры проверяются для каждой записи """
+    xread_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        item_class = StreamItem.using(db_instance=_mocked_stream_redis(patch=patch, xread_calls=xread_calls))
+        subscription: Subscription = item_class.subscribe(_batch_size=2, _last_id="0", subsystem_id=3)
+        batches: list[list[str]] = []
+        for batch in subscription.batches():
+            batches.append([item._table for item in batch])
+            if len(batches) == 2:
+                subscription.close()
+
+    assert batches == [["subsystem.3.tag.1"], ["subsystem.3.tag.2"]]
+    assert [list(streams.values())[0] for streams in xread_calls] == ["0", "2-0"]
+    assert subscription.last_id == "3-0"
+
+
+def test_subscription_reconnect(monkeypatch: MonkeyPatch) -> None:
+    """ При потере соединения чтение повторяется с последней полученной записи """
+    xread_calls: list[dict] = []
+    with monkeypatch.context() as patch:
+        patch.setattr("storage_orm.redis_impl.subscription.sleep", lambda _: None)
+        item_class = StreamItem.using(db_instance=_mocked_stream_redis(patch=patch, xread_calls=xread_calls, failures=2))
+        subscription: Subscription = item_class.subscribe(any_value__gt=10)
+        item: RedisItem = next(iter(subscription))
+
+    # Позиция "$" фиксируется по последней записи потока до первого чтения
+    assert [list(streams.values())[0] for streams in xread_calls] == ["1-0", "1-0", "1-0"]
+    assert item.mapping == {"subsystem.4.tag.1.date_time": 20, "subsystem.4.tag.1.any_value": 11.5}
+
+
+def test_subscription_async_iterator(monkeypatch: MonkeyPatch) -> None:
+    xread_calls: list[dict] = []
+
+    async def read_items(subscription: Subscription) -> list[str]:
+        tables: list[str] = []
+        async for item in subscription:
+            tables.append(item._table)
+            if len(tables) == 2:
+                subscription.close()
+        return tables
+
+    with monkeypatch.context() as patch:
+        item_class = StreamItem.using(db_instance=_mocked_stream_redis(patch=patch, xread_calls=xread_calls))
+        tables: list[str] = asyncio.run(read_items(item_class.subscribe(_last_id="0", date_time__gte=20)))
+
+    assert tables == ["subsystem.4.tag.1", "subsystem.3.tag.2"]
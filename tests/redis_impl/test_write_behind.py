@@ -0,0 +1,219 @@
+import time
+import redis
+import pytest
+import threading
+
+from storage_orm import RedisORM
+from storage_orm import RedisItem
+from storage_orm.redis_impl.write_behind import WriteBehindBuffer
+
+from .mocked_redis import MockedRedis
+
+
+class BufferedItem(RedisItem):
+    date_time: int
+    any_value: float
+
+    class Meta:
+        table = "subsystem.{subsystem_id}.tag.{tag_id}"
+
+
+@pytest.fixture
+def mocked_redis() -> MockedRedis:
+    return MockedRedis()
+
+
+def _wait_for(condition, timeout: float = 2.) -> bool:
+    """ Ожидание выполнения условия фоновым потоком """
+    deadline: float = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_coalesce_same_item(mocked_redis: MockedRedis) -> None:
+    """ Повторные записи одного объекта объединяются, записывается последнее состояние """
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=mocked_redis, flush_interval=60)
+    for date_time in range(10):
+        write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=date_time, any_value=1.))
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=2, date_time=1, any_value=1.))
+    assert len(write_buffer) == 2
+    assert write_buffer.flush().ok
+    assert mocked_redis._pipe.calls_count == 2
+    assert mocked_redis._pipe.execute_calls_count == 1
+    write_buffer.close()
+
+
+def test_flush_by_size(mocked_redis: MockedRedis) -> None:
+    """ Фоновая запись начинается при накоплении flush_size объектов """
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=mocked_redis, flush_size=5, flush_interval=60)
+    for tag_id in range(5):
+        write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=tag_id, date_time=1, any_value=1.))
+    assert _wait_for(lambda: mocked_redis._pipe.calls_count == 5)
+    write_buffer.close()
+
+
+def test_flush_by_interval(mocked_redis: MockedRedis) -> None:
+    """ Фоновая запись выполняется по истечении flush_interval """
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=mocked_redis, flush_interval=0.05)
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+    assert _wait_for(lambda: mocked_redis._pipe.calls_count == 1)
+    write_buffer.close()
+
+
+def test_back_pressure(mocked_redis: MockedRedis) -> None:
+    """ При заполненном буфере put() ожидает записи, а не увеличивает буфер """
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(
+        client=mocked_redis,
+        max_size=2,
+        flush_size=2,
+        flush_interval=60,
+    )
+    max_pending: list[int] = []
+
+    def producer() -> None:
+        for tag_id in range(20):
+            write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=tag_id, date_time=1, any_value=1.))
+            max_pending.append(len(write_buffer))
+
+    thread: threading.Thread = threading.Thread(target=producer)
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert max(max_pending) <= 2
+    write_buffer.close()
+    assert mocked_redis._pipe.calls_count == 20
+
+
+def test_close_flushes_and_rejects(mocked_redis: MockedRedis) -> None:
+    """ close() записывает оставшиеся объекты, после закрытия буфер не принимает записи """
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=mocked_redis, flush_interval=60)
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+    assert write_buffer.close().ok
+    assert mocked_redis._pipe.calls_count == 1
+    with pytest.raises(Exception) as exception:
+        write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+
+    assert "closed" in str(exception.value)
+
+
+class FailingRedis(MockedRedis):
+    """ Подключение, pipeline которого завершается ошибкой подключения failures_count раз """
+    failures_count: int = 0
+    on_failure = None
+
+    def execute(self, **_) -> None:
+        if self.failures_count:
+            self.failures_count -= 1
+            if self.on_failure is not None:
+                self.on_failure()
+            raise redis.exceptions.ConnectionError("Connection refused")
+        super().execute()
+
+
+def test_write_retry(monkeypatch) -> None:
+    """ Запись пакета повторяется с паузой при временной ошибке подключения """
+    sleeps: list[float] = []
+    monkeypatch.setattr("storage_orm.redis_impl.write_behind.sleep", sleeps.append)
+    failing_redis: FailingRedis = FailingRedis()
+    failing_redis._pipe.failures_count = 2
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=failing_redis, flush_interval=60, retry_backoff=0.1)
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+    assert write_buffer.flush().ok
+    assert sleeps == [0.1, 0.2]
+    assert failing_redis._pipe.execute_calls_count == 1
+    assert not len(write_buffer)
+    write_buffer.close()
+
+
+def test_write_failure_requeue(monkeypatch) -> None:
+    """ Незаписанные объекты возвращаются в буфер, более новое состояние объекта не заменяется """
+    monkeypatch.setattr("storage_orm.redis_impl.write_behind.sleep", lambda _: None)
+    failing_redis: FailingRedis = FailingRedis()
+    failing_redis._pipe.failures_count = 2
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=failing_redis, flush_interval=60, retry_count=1)
+    newer_item: BufferedItem = BufferedItem(subsystem_id=1, tag_id=1, date_time=2, any_value=2.)
+    failing_redis._pipe.on_failure = lambda: write_buffer.put(item=newer_item)
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=2, date_time=1, any_value=1.))
+
+    result = write_buffer.flush()
+    assert not result.ok
+    assert "2 objects returned to buffer" in result.message
+    assert len(write_buffer) == 2
+    assert write_buffer._pending[(BufferedItem, "subsystem.1.tag.1")] is newer_item
+    # Подключение восстановлено - буфер записывается при закрытии
+    assert write_buffer.close().ok
+    assert not len(write_buffer)
+
+
+class ValidatingRedis(MockedRedis):
+    """ Подключение, pipeline которого отклоняет пакет со значением None (как redis-py при MSET) """
+    written: list[dict]
+    _batch: list[dict]
+
+    def __init__(self, is_pipe: bool = False) -> None:
+        self.written = []
+        self._batch = []
+        super().__init__(is_pipe=is_pipe)
+
+    def mset(self, mapping: dict, **_) -> None:
+        self._batch.append(mapping)
+
+    def execute(self, **_) -> None:
+        batch, self._batch = self._batch, []
+        if any(value is None for mapping in batch for value in mapping.values()):
+            raise redis.exceptions.DataError("Invalid input of type: 'NoneType'")
+        self.written += batch
+
+
+def test_write_drops_invalid_item() -> None:
+    """ Объект, запись которого невозможна, отбрасывается, остальные объекты пакета записываются """
+    validating_redis: ValidatingRedis = ValidatingRedis()
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(client=validating_redis, flush_interval=60)
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1))
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=2, date_time=1, any_value=1.))
+
+    result = write_buffer.flush()
+    assert not result.ok
+    assert "1 objects dropped: BufferedItem(subsystem.1.tag.1)" in result.message
+    assert not len(write_buffer)
+    assert validating_redis._pipe.written == [
+        {"subsystem.1.tag.2.date_time": 1, "subsystem.1.tag.2.any_value": 1.},
+    ]
+    write_buffer.close()
+
+
+def test_background_write_waits_after_failure() -> None:
+    """ После неудачной записи фоновый поток ожидает flush_interval, а не повторяет запись сразу """
+    failing_redis: FailingRedis = FailingRedis()
+    failing_redis._pipe.failures_count = 1_000
+    write_buffer: WriteBehindBuffer = WriteBehindBuffer(
+        client=failing_redis,
+        flush_size=1,
+        flush_interval=60,
+        retry_count=0,
+    )
+    write_buffer.put(item=BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.))
+    assert _wait_for(lambda: failing_redis._pipe.failures_count == 999)
+    time.sleep(0.05)
+    assert failing_redis._pipe.failures_count == 999
+    assert len(write_buffer) == 1
+    failing_redis._pipe.failures_count = 0
+    write_buffer.close()
+
+
+def test_orm_write_behind_save(mocked_redis: MockedRedis) -> None:
+    """ В режиме write_behind save() глобального подключения помещает объект в буфер """
+    RedisItem._db_instance = None
+    orm: RedisORM = RedisORM(client=mocked_redis, write_behind=True, flush_interval=60)
+    try:
+        assert BufferedItem(subsystem_id=1, tag_id=1, date_time=1, any_value=1.).save().ok
+        assert mocked_redis.calls_count == 0
+        assert mocked_redis._pipe.calls_count == 0
+        assert orm.flush().ok
+        assert mocked_redis._pipe.calls_count == 1
+    finally:
+        orm.close()
+        RedisItem._db_instance = None
+    assert RedisItem._write_buffer is None